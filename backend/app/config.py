@@ -1,3 +1,6 @@
+import re
+from typing import Optional
+from pydantic import field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,12 +10,84 @@ class Settings(BaseSettings):
     # MongoDB Configuration
     MONGODB_URI: str
     DATABASE_NAME: str
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    # Milliseconds a request may wait for a pooled connection (unset = no limit)
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    # Comma-separated wire compressors, e.g. "zstd,snappy,zlib" (empty = none)
+    MONGODB_COMPRESSORS: str = ""
+    # primary, primaryPreferred, secondary, secondaryPreferred or nearest
+    MONGODB_READ_PREFERENCE: str = "primary"
+    # Record command latency and pool usage for the /metrics endpoint
+    MONGODB_MONITORING_ENABLED: bool = True
     
     # JWT Configuration
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # A rotated refresh token presented again within this many seconds is
+    # rejected without revoking its family (parallel refreshes from two tabs)
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 10
+    # JWT verification backend: "jose" (default) or "pyjwt" (requires PyJWT)
+    JWT_BACKEND: str = "jose"
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    
+    # Password Hashing Configuration
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    
+    # Authentication Cache Configuration
+    USER_CACHE_ENABLED: bool = True
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Trust signed token claims on read endpoints instead of loading the user
+    AUTH_TRUST_TOKEN_CLAIMS: bool = False
+    
+    # Label Cache Configuration (per-process; every read is revalidated
+    # against the user's label change counter)
+    LABEL_CACHE_ENABLED: bool = True
+    LABEL_CACHE_TTL_SECONDS: int = 300
+    LABEL_CACHE_MAX_SIZE: int = 10000
+    
+    # Tasks referencing a deleted label above which the label is removed from
+    # them in the background after responding (0 = always inline)
+    LABEL_CASCADE_BACKGROUND_THRESHOLD: int = 10000
+    
+    # Labels created for every new user, as comma-separated name:#color pairs
+    DEFAULT_LABELS: str = "Work:#3B82F6,Personal:#10B981,Urgent:#EF4444,Shopping:#F59E0B,Health:#EC4899"
+    
+    # Conditional GET Configuration (seconds after which task list ETags roll
+    # over so time-derived fields such as is_overdue are refreshed)
+    ETAG_TIME_BUCKET_SECONDS: int = 60
+    
+    # Change Feed Configuration ("memory" for a single worker, "redis" to
+    # share events between workers; the latter requires the redis package)
+    EVENT_BROKER: str = "memory"
+    EVENT_BROKER_URL: str = "redis://localhost:6379/0"
+    EVENT_QUEUE_SIZE: int = 100
+    EVENT_HEARTBEAT_SECONDS: int = 15
+    
+    # Serialize task lists directly to JSON (with orjson when installed)
+    # instead of validating every row through Pydantic
+    FAST_JSON_RESPONSES: bool = False
+    
+    # Response Compression Configuration (br and zstd are used only when the
+    # brotli / zstandard packages are installed)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_ALGORITHMS: str = "br,zstd,gzip"
+    
+    # Export Configuration
+    EXPORT_BATCH_SIZE: int = 500
+    
+    # Internal Metrics Configuration (/metrics answers 404 unless a token is
+    # set, and then requires "Authorization: Bearer <METRICS_TOKEN>")
+    METRICS_TOKEN: Optional[str] = None
     
     # Application Configuration
     APP_NAME: str = "TODO API"
@@ -28,10 +103,66 @@ class Settings(BaseSettings):
         case_sensitive=True
     )
     
+    @field_validator("DEFAULT_LABELS")
+    @classmethod
+    def validate_default_labels(cls, v: str) -> str:
+        """Reject label templates that registration could not insert.
+        
+        Checked at startup so a bad template fails fast instead of breaking
+        every signup after the user document has been written.
+        """
+        names = set()
+        for entry in v.split(","):
+            if not entry.strip():
+                continue
+            if ":" not in entry:
+                raise ValueError(f"DEFAULT_LABELS entry '{entry.strip()}' must be in name:#RRGGBB format")
+            name, color = (part.strip() for part in entry.rsplit(":", 1))
+            if not 1 <= len(name) <= 50:
+                raise ValueError(f"DEFAULT_LABELS name '{name}' must be 1-50 characters")
+            if not re.match(r'^#[0-9A-Fa-f]{6}$', color):
+                raise ValueError(f"DEFAULT_LABELS color '{color}' for '{name}' must be a hex code like #FF5733")
+            if name in names:
+                raise ValueError(f"DEFAULT_LABELS contains '{name}' more than once")
+            names.add(name)
+        return v
+    
     @property
     def cors_origins(self) -> list[str]:
         """Parse ALLOWED_ORIGINS string into a list."""
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
+    
+    @property
+    def mongodb_client_options(self) -> dict:
+        """Build the AsyncIOMotorClient keyword arguments for pool tuning."""
+        options = {
+            "maxPoolSize": self.MONGODB_MAX_POOL_SIZE,
+            "minPoolSize": self.MONGODB_MIN_POOL_SIZE,
+            "serverSelectionTimeoutMS": self.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            "readPreference": self.MONGODB_READ_PREFERENCE
+        }
+        if self.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+            options["waitQueueTimeoutMS"] = self.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+        compressors = [name.strip() for name in self.MONGODB_COMPRESSORS.split(",") if name.strip()]
+        if compressors:
+            options["compressors"] = compressors
+        return options
+    
+    @property
+    def compression_algorithms(self) -> list[str]:
+        """Parse COMPRESSION_ALGORITHMS string into a preference-ordered list."""
+        return [name.strip().lower() for name in self.COMPRESSION_ALGORITHMS.split(",") if name.strip()]
+    
+    @property
+    def default_labels(self) -> list[dict]:
+        """Parse DEFAULT_LABELS string into a list of label templates."""
+        labels = []
+        for entry in self.DEFAULT_LABELS.split(","):
+            if not entry.strip():
+                continue
+            name, color = entry.rsplit(":", 1)
+            labels.append({"name": name.strip(), "color": color.strip().upper()})
+        return labels
 
 
 # Global settings instance
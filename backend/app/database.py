@@ -1,17 +1,27 @@
-from pymongo import MongoClient
-from pymongo.database import Database
-from pymongo.errors import ConnectionFailure, ConfigurationError
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.errors import ConnectionFailure, ConfigurationError, OperationFailure
 from app.config import settings
+from app.models.user import UserModel
+from app.models.task import TaskModel
+from app.models.label import LabelModel
+from app.models.token import TokenModel
+from app.models.token_family import TokenFamilyModel
+from app.utils.db_monitoring import db_monitor
+
+# Document models whose declared indexes are provisioned at startup
+INDEXED_MODELS = [UserModel, TaskModel, LabelModel, TokenModel, TokenFamilyModel]
 
 
 class DatabaseManager:
-    """Manages MongoDB connection and provides database instance."""
+    """Manages the async MongoDB connection and provides database instance."""
     
     def __init__(self):
-        self.client: MongoClient | None = None
-        self.db: Database | None = None
+        self.client: AsyncIOMotorClient | None = None
+        self.db: AsyncIOMotorDatabase | None = None
+        # Multi-document transactions need a replica set or sharded cluster
+        self.supports_transactions = False
     
-    def connect(self):
+    async def connect(self):
         """Establish connection to MongoDB."""
         try:
             # Check if we have a placeholder MongoDB URI
@@ -20,9 +30,15 @@ class DatabaseManager:
                 print("For now, the application will run without database connection for testing.")
                 return
             
-            self.client = MongoClient(settings.MONGODB_URI)
-            # Test the connection
-            self.client.admin.command('ping')
+            event_listeners = [db_monitor] if settings.MONGODB_MONITORING_ENABLED else []
+            self.client = AsyncIOMotorClient(
+                settings.MONGODB_URI,
+                event_listeners=event_listeners,
+                **settings.mongodb_client_options
+            )
+            # Test the connection and detect the deployment topology
+            hello = await self.client.admin.command('hello')
+            self.supports_transactions = "setName" in hello or hello.get("msg") == "isdbgrid"
             self.db = self.client[settings.DATABASE_NAME]
             print(f"Successfully connected to MongoDB database: {settings.DATABASE_NAME}")
         except (ConnectionFailure, ConfigurationError) as e:
@@ -32,23 +48,70 @@ class DatabaseManager:
             print(f"ERROR: Unexpected error connecting to MongoDB: {e}")
             raise
     
+    async def ensure_indexes(self):
+        """Create the indexes declared by each document model.
+        
+        Runs once at startup; create_indexes is a no-op for indexes that
+        already exist, so request handlers never need to create them.
+        Indexes and documents left over from earlier schemas are removed
+        first so they cannot block the current indexes.
+        
+        Duplicate detection (emails, usernames, label names, refresh tokens)
+        relies on the unique indexes, so failing to build one of them (e.g.
+        because existing documents already collide) stops startup.
+        """
+        if self.db is None:
+            return
+        
+        for model in INDEXED_MODELS:
+            collection_name = model.get_collection_name()
+            for index_name in getattr(model, "get_dropped_indexes", list)():
+                try:
+                    await self.db[collection_name].drop_index(index_name)
+                except OperationFailure:
+                    # Already dropped (or never created)
+                    pass
+            obsolete_filter = getattr(model, "get_obsolete_filter", lambda: None)()
+            if obsolete_filter is not None:
+                result = await self.db[collection_name].delete_many(obsolete_filter)
+                if result.deleted_count:
+                    print(f"Removed {result.deleted_count} obsolete documents from '{collection_name}'")
+            indexes = model.get_indexes()
+            unique_indexes = [index for index in indexes if index.document.get("unique")]
+            other_indexes = [index for index in indexes if not index.document.get("unique")]
+            
+            if unique_indexes:
+                try:
+                    await self.db[collection_name].create_indexes(unique_indexes)
+                except OperationFailure as e:
+                    raise RuntimeError(
+                        f"Could not create unique indexes for '{collection_name}': {e}. "
+                        "Remove the duplicate documents and restart."
+                    ) from e
+            
+            if other_indexes:
+                try:
+                    await self.db[collection_name].create_indexes(other_indexes)
+                except OperationFailure as e:
+                    print(f"WARNING: Could not create indexes for '{collection_name}': {e}")
+    
     def close(self):
         """Close MongoDB connection."""
         if self.client:
             self.client.close()
             print("MongoDB connection closed")
     
-    def get_database(self) -> Database:
+    def get_database(self) -> AsyncIOMotorDatabase:
         """Get the database instance."""
         if self.db is None:
             raise RuntimeError("Database not connected. Call connect() first.")
         return self.db
     
-    def check_connection(self) -> bool:
+    async def check_connection(self) -> bool:
         """Check if database connection is active."""
         try:
             if self.client:
-                self.client.admin.command('ping')
+                await self.client.admin.command('ping')
                 return True
             return False
         except Exception:
@@ -59,7 +122,11 @@ class DatabaseManager:
 db_manager = DatabaseManager()
 
 
-def get_db() -> Database:
-    """Dependency to get database instance in route handlers."""
+def get_db() -> AsyncIOMotorDatabase:
+    """Dependency to get database instance in route handlers.
+    
+    Collection operations on the returned database are coroutines and must
+    be awaited, so a slow query never blocks the event loop.
+    """
     return db_manager.get_database()
 
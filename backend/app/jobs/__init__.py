@@ -0,0 +1 @@
+# Jobs package for offline maintenance tasks
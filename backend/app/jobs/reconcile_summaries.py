@@ -0,0 +1,30 @@
+"""Rebuild per-user task summaries from the tasks collection and report drift.
+
+Also creates the summaries of users registered before summaries existed;
+run it once after upgrading.
+
+Run with: python -m app.jobs.reconcile_summaries
+"""
+import asyncio
+
+from app.database import db_manager
+from app.utils.task_summary import reconcile_all_summaries
+
+
+async def main():
+    """Reconcile every stored task summary."""
+    await db_manager.connect()
+    try:
+        drifted = await reconcile_all_summaries(db_manager.get_database())
+        for drift in drifted:
+            if drift["stored"] is None:
+                print(f"Created missing summary for user {drift['user_id']}: {drift['expected']}")
+            else:
+                print(f"Drift for user {drift['user_id']}: stored={drift['stored']} expected={drift['expected']}")
+        print(f"Reconciled task summaries: {len(drifted)} drifted")
+    finally:
+        db_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,11 +1,19 @@
-from fastapi import FastAPI
+import secrets
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from app.config import settings
 from app.database import db_manager
+from app.middleware.compression import CompressionMiddleware
+from app.utils.auth import token_cache, user_cache
+from app.utils.db_monitoring import db_monitor
+from app.utils.events import event_broker
+from app.utils.labels import label_cache
+from app.utils.hashing import password_hash_pool
 from app.routers.auth import router as auth_router
 from app.routers.tasks import router as tasks_router
 from app.routers.labels import router as labels_router
+from app.routers.events import router as events_router
 
 
 @asynccontextmanager
@@ -13,10 +21,15 @@ async def lifespan(app: FastAPI):
     """Handle application startup and shutdown events."""
     # Startup
     print(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}...")
-    db_manager.connect()
+    await db_manager.connect()
+    await db_manager.ensure_indexes()
+    password_hash_pool.start()
+    await event_broker.start()
     yield
     # Shutdown
     print(f"Shutting down {settings.APP_NAME}...")
+    await event_broker.stop()
+    password_hash_pool.shutdown()
     db_manager.close()
 
 
@@ -35,12 +48,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Configure response compression
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        level=settings.COMPRESSION_LEVEL,
+        algorithms=settings.compression_algorithms,
+    )
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(tasks_router)
 app.include_router(labels_router)
+app.include_router(events_router)
 
 
 @app.get("/")
@@ -56,7 +80,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint to verify API and database status."""
-    db_status = "connected" if db_manager.check_connection() else "disconnected"
+    db_status = "connected" if await db_manager.check_connection() else "disconnected"
     
     return {
         "status": "healthy" if db_status == "connected" else "unhealthy",
@@ -65,3 +89,34 @@ async def health_check():
         "version": settings.APP_VERSION
     }
 
+
+def require_metrics_token(request: Request):
+    """Restrict /metrics to callers holding METRICS_TOKEN.
+    
+    The endpoint exposes pool, cache and database internals, so it is
+    hidden entirely unless a token is configured.
+    """
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def metrics():
+    """Internal metrics endpoint for sizing workers and pools."""
+    return {
+        "password_hash_pool": password_hash_pool.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "label_cache": label_cache.stats(),
+        "events": event_broker.stats(),
+        "database": db_monitor.stats()
+    }
+
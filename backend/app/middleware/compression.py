@@ -0,0 +1,123 @@
+import gzip
+from typing import Callable, Dict, List, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+def _compressors(level: int) -> Dict[str, Callable[[bytes], bytes]]:
+    """Get the compressors available in this environment, keyed by encoding."""
+    compressors = {"gzip": lambda body: gzip.compress(body, compresslevel=min(level, 9))}
+    if brotli is not None:
+        compressors["br"] = lambda body: brotli.compress(body, quality=min(level, 11))
+    if zstandard is not None:
+        compressor = zstandard.ZstdCompressor(level=level)
+        compressors["zstd"] = compressor.compress
+    return compressors
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    """Parse an Accept-Encoding header into the encodings with a non-zero q."""
+    accepted = set()
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if quality > 0:
+            accepted.add(token.strip().lower())
+    return accepted
+
+
+class CompressionMiddleware:
+    """Compress complete responses with the best encoding the client accepts.
+    
+    Responses smaller than minimum_size, already encoded, or sent in several
+    chunks (streaming exports, Server-Sent Events) are passed through
+    untouched so streaming latency is not affected.
+    """
+    
+    def __init__(self, app: ASGIApp, minimum_size: int, level: int, algorithms: List[str]):
+        self.app = app
+        self.minimum_size = minimum_size
+        available = _compressors(level)
+        self.compressors = [(name, available[name]) for name in algorithms if name in available]
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        compressor = next(
+            ((name, compress) for name, compress in self.compressors if name in accepted),
+            None
+        )
+        if compressor is None:
+            await self.app(scope, receive, send)
+            return
+        
+        responder = _CompressionResponder(send, self.minimum_size, *compressor)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Buffers the response start until it is known whether to compress."""
+    
+    def __init__(self, send: Send, minimum_size: int, encoding: str, compress: Callable[[bytes], bytes]):
+        self._send = send
+        self.minimum_size = minimum_size
+        self.encoding = encoding
+        self.compress = compress
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+    
+    async def send(self, message: Message):
+        if self.passthrough:
+            await self._send(message)
+            return
+        
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            return
+        
+        if message["type"] != "http.response.body" or self.start_message is None:
+            await self._send(message)
+            return
+        
+        start_message, self.start_message = self.start_message, None
+        headers = MutableHeaders(raw=start_message["headers"])
+        body = message.get("body", b"")
+        
+        if (
+            message.get("more_body", False)
+            or "content-encoding" in headers
+            or headers.get("content-type", "").startswith("text/event-stream")
+            or len(body) < self.minimum_size
+        ):
+            self.passthrough = True
+            await self._send(start_message)
+            await self._send(message)
+            return
+        
+        compressed = self.compress(body)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await self._send(start_message)
+        await self._send({"type": "http.response.body", "body": compressed})
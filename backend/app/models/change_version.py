@@ -0,0 +1,14 @@
+class ChangeVersionModel:
+    """Per-user write counter document model for MongoDB.
+    
+    One document per user, keyed by user ID, with a counter per resource
+    scope ("tasks", "labels") that is incremented on every write.
+    """
+    
+    TASKS = "tasks"
+    LABELS = "labels"
+    
+    @staticmethod
+    def get_collection_name() -> str:
+        """Get the collection name for change versions."""
+        return "change_versions"
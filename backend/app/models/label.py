@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional
+from pymongo import ASCENDING, IndexModel
 
 
 class LabelModel:
@@ -27,4 +28,11 @@ class LabelModel:
     def get_collection_name() -> str:
         """Get the collection name for labels."""
         return "labels"
+    
+    @staticmethod
+    def get_indexes() -> list[IndexModel]:
+        """Get the indexes required by label queries."""
+        return [
+            IndexModel([("user_id", ASCENDING), ("name", ASCENDING)], unique=True)
+        ]
 
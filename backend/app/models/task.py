@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional, List
+from pymongo import ASCENDING, TEXT, IndexModel
 
 
 class TaskModel:
@@ -47,8 +48,77 @@ class TaskModel:
             deadline = deadline.replace(tzinfo=timezone.utc)
         return now > deadline
     
+    @staticmethod
+    def overdue_filter(overdue: bool, now: Optional[datetime] = None) -> dict:
+        """Build a query predicate matching tasks that are (or are not) overdue.
+        
+        Mirrors is_overdue so the filter can run inside MongoDB.
+        """
+        now = now or datetime.utcnow()
+        if overdue:
+            return {"completed": False, "deadline": {"$lt": now}}
+        return {"$or": [{"completed": True}, {"deadline": {"$gte": now}}]}
+    
+    @staticmethod
+    def stats_pipeline(user_id: str, now: Optional[datetime] = None) -> List[dict]:
+        """Build an aggregation pipeline computing a user's task counts.
+        
+        A single $facet pass yields totals, overdue count and per-priority
+        and per-label breakdowns.
+        """
+        now = now or datetime.utcnow()
+        return [
+            {"$match": {"user_id": user_id}},
+            {"$project": {"completed": 1, "deadline": 1, "priority": 1, "label_ids": 1}},
+            {"$facet": {
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "completed": {"$sum": {"$cond": ["$completed", 1, 0]}},
+                        "overdue": {"$sum": {"$cond": [
+                            {"$and": [{"$eq": ["$completed", False]}, {"$lt": ["$deadline", now]}]},
+                            1,
+                            0
+                        ]}}
+                    }}
+                ],
+                "by_priority": [
+                    {"$group": {"_id": "$priority", "count": {"$sum": 1}}}
+                ],
+                "by_label": [
+                    {"$unwind": "$label_ids"},
+                    {"$group": {"_id": "$label_ids", "count": {"$sum": 1}}}
+                ]
+            }}
+        ]
+    
     @staticmethod
     def get_collection_name() -> str:
         """Get the collection name for tasks."""
         return "tasks"
+    
+    @staticmethod
+    def get_indexes() -> List[IndexModel]:
+        """Get the indexes required by task queries and sorts.
+        
+        Every sortable field is indexed together with _id, which breaks ties
+        so keyset pagination stays stable.
+        """
+        return [
+            IndexModel([("user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("updated_at", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("deadline", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("priority", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("title", ASCENDING), ("_id", ASCENDING)]),
+            IndexModel([("user_id", ASCENDING), ("completed", ASCENDING), ("deadline", ASCENDING)]),
+            # Multikey index for label filters and the label deletion cascade
+            IndexModel([("user_id", ASCENDING), ("label_ids", ASCENDING)]),
+            # Per-user full-text search; titles weigh more than descriptions
+            IndexModel(
+                [("user_id", ASCENDING), ("title", TEXT), ("description", TEXT)],
+                weights={"title": 3, "description": 1},
+                name="task_text_search"
+            )
+        ]
 
@@ -0,0 +1,93 @@
+from datetime import datetime
+from typing import Optional, List
+from bson import ObjectId
+
+
+class TaskSummaryModel:
+    """Per-user task counter document model for MongoDB.
+    
+    One document per user, keyed by user ID, holding counts that are kept
+    up to date with $inc as tasks are written:
+        
+        {"_id": user_id, "total": int, "completed": int,
+         "by_priority": {priority: int}, "by_label": {label_id: int}}
+    """
+    
+    @staticmethod
+    def task_counters(task_doc: Optional[dict], sign: int = 1) -> dict:
+        """Get the $inc contribution of a single task document."""
+        if not task_doc:
+            return {}
+        
+        counters = {"total": sign, f"by_priority.{task_doc['priority']}": sign}
+        if task_doc.get("completed"):
+            counters["completed"] = sign
+        for label_id in set(task_doc.get("label_ids") or []):
+            # Only ObjectId strings are safe to use as field names
+            if ObjectId.is_valid(label_id):
+                counters[f"by_label.{label_id}"] = sign
+        return counters
+    
+    @staticmethod
+    def merge_counters(*counter_sets: dict) -> dict:
+        """Sum several $inc documents, dropping counters that net to zero."""
+        merged = {}
+        for counters in counter_sets:
+            for field, value in counters.items():
+                merged[field] = merged.get(field, 0) + value
+        return {field: value for field, value in merged.items() if value}
+    
+    @staticmethod
+    def diff_counters(before: Optional[dict], after: Optional[dict]) -> dict:
+        """Get the $inc needed when a task changes from before to after."""
+        return TaskSummaryModel.merge_counters(
+            TaskSummaryModel.task_counters(before, -1),
+            TaskSummaryModel.task_counters(after, 1)
+        )
+    
+    @staticmethod
+    def create_summary(
+        user_id: str,
+        total: int = 0,
+        completed: int = 0,
+        by_priority: Optional[dict] = None,
+        by_label: Optional[dict] = None
+    ) -> dict:
+        """Create a new summary document."""
+        return {
+            "_id": user_id,
+            "total": total,
+            "completed": completed,
+            "by_priority": by_priority or {},
+            "by_label": by_label or {},
+            "updated_at": datetime.utcnow()
+        }
+    
+    @staticmethod
+    def rebuild_pipeline(user_id: str) -> List[dict]:
+        """Build an aggregation pipeline recomputing a user's counters from tasks."""
+        return [
+            {"$match": {"user_id": user_id}},
+            {"$project": {"completed": 1, "priority": 1, "label_ids": 1}},
+            {"$facet": {
+                "totals": [
+                    {"$group": {
+                        "_id": None,
+                        "total": {"$sum": 1},
+                        "completed": {"$sum": {"$cond": ["$completed", 1, 0]}}
+                    }}
+                ],
+                "by_priority": [
+                    {"$group": {"_id": "$priority", "count": {"$sum": 1}}}
+                ],
+                "by_label": [
+                    {"$unwind": "$label_ids"},
+                    {"$group": {"_id": "$label_ids", "count": {"$sum": 1}}}
+                ]
+            }}
+        ]
+    
+    @staticmethod
+    def get_collection_name() -> str:
+        """Get the collection name for task summaries."""
+        return "task_summaries"
@@ -1,16 +1,33 @@
+import hashlib
+import secrets
 from datetime import datetime
 from typing import Optional
+from pymongo import ASCENDING, IndexModel
 
 
 class TokenModel:
     """Refresh token document model for MongoDB."""
     
     @staticmethod
-    def create_refresh_token(user_id: str, token: str, expires_at: datetime) -> dict:
-        """Create a new refresh token document."""
+    def hash_token(token: str) -> bytes:
+        """Get the fixed-size lookup key a refresh token is stored under."""
+        return hashlib.sha256(token.encode("utf-8")).digest()
+    
+    @staticmethod
+    def new_family_id() -> str:
+        """Generate the ID shared by all refresh tokens rotated from one login."""
+        return secrets.token_hex(16)
+    
+    @staticmethod
+    def create_refresh_token(user_id: str, token: str, expires_at: datetime, family_id: str) -> dict:
+        """Create a new refresh token document.
+        
+        Only the SHA-256 digest of the token is stored, never the JWT itself.
+        """
         return {
             "user_id": user_id,
-            "token": token,
+            "token_hash": TokenModel.hash_token(token),
+            "family_id": family_id,
             "expires_at": expires_at,
             "revoked": False,
             "created_at": datetime.utcnow()
@@ -20,4 +37,34 @@ class TokenModel:
     def get_collection_name() -> str:
         """Get the collection name for refresh tokens."""
         return "refresh_tokens"
+    
+    @staticmethod
+    def get_indexes() -> list[IndexModel]:
+        """Get the indexes required by refresh token lookups and expiry."""
+        return [
+            IndexModel([("token_hash", ASCENDING)], unique=True),
+            IndexModel([("family_id", ASCENDING)]),
+            # Let MongoDB purge refresh tokens once they expire
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        ]
+    
+    @staticmethod
+    def get_dropped_indexes() -> list[str]:
+        """Get the names of indexes from earlier schemas that must be removed.
+        
+        The unique index on the raw token string would reject every new
+        document, since they no longer carry that field.
+        """
+        return ["token_1"]
+    
+    @staticmethod
+    def get_obsolete_filter() -> dict:
+        """Get the filter matching documents from earlier schemas that must be removed.
+        
+        Rows keyed by the raw token string have no token_hash, so no lookup
+        can reach them; they would also all collide as null in the unique
+        token_hash index. The null equality is answered by that index once
+        it exists, so later startups do not scan the collection.
+        """
+        return {"token_hash": None}
 
@@ -0,0 +1,33 @@
+from datetime import datetime
+from pymongo import ASCENDING, IndexModel
+
+
+class TokenFamilyModel:
+    """Revoked refresh token family document model for MongoDB.
+    
+    One document per revoked family, keyed by family ID. A rotation that
+    races with the revocation checks this marker after inserting its new
+    token, so the family cannot survive reuse detection.
+    """
+    
+    @staticmethod
+    def create_revocation(user_id: str, expires_at: datetime) -> dict:
+        """Create the fields of a revoked family document (keyed by family ID)."""
+        return {
+            "user_id": user_id,
+            "expires_at": expires_at,
+            "revoked_at": datetime.utcnow()
+        }
+    
+    @staticmethod
+    def get_collection_name() -> str:
+        """Get the collection name for revoked token families."""
+        return "revoked_token_families"
+    
+    @staticmethod
+    def get_indexes() -> list[IndexModel]:
+        """Get the indexes required by revoked family expiry."""
+        return [
+            # Drop the marker once no token of the family can still be valid
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0)
+        ]
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
 
 
 class UserModel:
@@ -29,4 +30,12 @@ class UserModel:
     def get_collection_name() -> str:
         """Get the collection name for users."""
         return "users"
+    
+    @staticmethod
+    def get_indexes() -> list[IndexModel]:
+        """Get the indexes required by user queries."""
+        return [
+            IndexModel([("email", ASCENDING)], unique=True),
+            IndexModel([("username", ASCENDING)], unique=True)
+        ]
 
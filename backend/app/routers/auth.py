@@ -3,22 +3,25 @@ from typing import Optional
 from fastapi import APIRouter, Body, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from bson import ObjectId
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError, PyMongoError
 
-from app.database import get_db
+from app.database import db_manager, get_db
 from app.schemas.user import UserCreate, UserLogin, UserUpdate, UserResponse, Token, TokenRefresh
 from app.models.user import UserModel
 from app.models.token import TokenModel
+from app.models.token_family import TokenFamilyModel
 from app.models.label import LabelModel
 from app.utils.auth import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token,
     get_current_user,
-    verify_token_type
+    invalidate_cached_user
 )
+from app.utils.task_summary import create_empty_summary
 from app.config import settings
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
@@ -26,68 +29,53 @@ router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
-    """Register a new user."""
+    """Register a new user.
+    
+    Duplicate emails and usernames are detected by the unique indexes on
+    insert rather than by separate lookups beforehand.
+    """
     db = get_db()
     users_collection = db[UserModel.get_collection_name()]
     
-    # Check if user already exists
-    existing_user = users_collection.find_one({"email": user_data.email})
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Check if username already exists
-    existing_username = users_collection.find_one({"username": user_data.username})
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username already taken"
-        )
-    
     # Hash password and create user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     user_doc = UserModel.create_user(
         email=user_data.email,
         username=user_data.username,
         hashed_password=hashed_password
     )
     
-    # Create unique indexes
-    users_collection.create_index("email", unique=True)
-    users_collection.create_index("username", unique=True)
-    
     try:
-        result = users_collection.insert_one(user_doc)
+        result = await users_collection.insert_one(user_doc)
         user_doc["_id"] = result.inserted_id
         user_id = str(result.inserted_id)
-        
-        # Create predefined labels for new user
-        labels_collection = db[LabelModel.get_collection_name()]
-        predefined_labels = [
-            {"name": "Work", "color": "#3B82F6"},      # Blue
-            {"name": "Personal", "color": "#10B981"},  # Green
-            {"name": "Urgent", "color": "#EF4444"},    # Red
-            {"name": "Shopping", "color": "#F59E0B"},  # Amber
-            {"name": "Health", "color": "#EC4899"},    # Pink
-        ]
-        
-        for label_data in predefined_labels:
-            label_doc = LabelModel.create_label(
-                name=label_data["name"],
-                color=label_data["color"],
-                user_id=user_id
-            )
-            labels_collection.insert_one(label_doc)
-        
-        return UserModel.to_dict(user_doc)
     
-    except DuplicateKeyError:
+    except DuplicateKeyError as e:
+        key_pattern = (e.details or {}).get("keyPattern", {})
+        if "email" in key_pattern:
+            detail = "Email already registered"
+        elif "username" in key_pattern:
+            detail = "Username already taken"
+        else:
+            detail = "User already exists"
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="User already exists"
+            detail=detail
         )
+    
+    # Create predefined labels for new user in a single batch
+    label_docs = [
+        LabelModel.create_label(name=label["name"], color=label["color"], user_id=user_id)
+        for label in settings.default_labels
+    ]
+    if label_docs:
+        labels_collection = db[LabelModel.get_collection_name()]
+        await labels_collection.insert_many(label_docs, ordered=False)
+    
+    # Task writes only $inc an existing summary, so create it up front
+    await create_empty_summary(db, user_id)
+    
+    return UserModel.to_dict(user_doc)
 
 
 @router.post("/login", response_model=Token)
@@ -97,9 +85,9 @@ async def login(user_data: UserLogin):
     users_collection = db[UserModel.get_collection_name()]
     
     # Find user by email
-    user = users_collection.find_one({"email": user_data.email})
+    user = await users_collection.find_one({"email": user_data.email})
     
-    if not user or not verify_password(user_data.password, user["hashed_password"]):
+    if not user or not await verify_password_async(user_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -116,9 +104,10 @@ async def login(user_data: UserLogin):
     refresh_token_doc = TokenModel.create_refresh_token(
         user_id=user_id,
         token=refresh_token,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        family_id=TokenModel.new_family_id()
     )
-    tokens_collection.insert_one(refresh_token_doc)
+    await tokens_collection.insert_one(refresh_token_doc)
     
     return Token(access_token=access_token, refresh_token=refresh_token)
 
@@ -133,9 +122,9 @@ async def login_oauth2(form_data: OAuth2PasswordRequestForm = Depends()):
     users_collection = db[UserModel.get_collection_name()]
     
     # Find user by email (username field contains email in OAuth2 form)
-    user = users_collection.find_one({"email": form_data.username})
+    user = await users_collection.find_one({"email": form_data.username})
     
-    if not user or not verify_password(form_data.password, user["hashed_password"]):
+    if not user or not await verify_password_async(form_data.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -152,45 +141,37 @@ async def login_oauth2(form_data: OAuth2PasswordRequestForm = Depends()):
     refresh_token_doc = TokenModel.create_refresh_token(
         user_id=user_id,
         token=refresh_token,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+        family_id=TokenModel.new_family_id()
     )
-    tokens_collection.insert_one(refresh_token_doc)
+    await tokens_collection.insert_one(refresh_token_doc)
     
     return Token(access_token=access_token, refresh_token=refresh_token)
 
 
 @router.post("/refresh", response_model=Token)
 async def refresh_token(token_data: TokenRefresh):
-    """Refresh access token using refresh token."""
-    # Verify token type
-    if not verify_token_type(token_data.refresh_token, "refresh"):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token type",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    """Refresh access token using refresh token.
+    
+    Rotation claims the presented token with a single atomic update and
+    inserts its replacement; on a replica set both run in one transaction.
+    Of several concurrent refreshes with the same token only one succeeds.
+    Either way the new token is withdrawn if its family was revoked
+    meanwhile, so a revoked family cannot be rotated back to life.
     
-    # Decode refresh token
-    decoded_token = decode_token(token_data.refresh_token)
+    The claimed row is kept as a compact revoked tombstone until its TTL
+    expiry. Presenting it again after REFRESH_TOKEN_REUSE_GRACE_SECONDS is
+    treated as reuse and revokes every token descended from the same login.
+    """
+    # Decode refresh token and verify its type in a single pass
+    decoded_token = decode_token(token_data.refresh_token, expected_type="refresh")
     
-    # Check if refresh token exists and is not revoked
     db = get_db()
     tokens_collection = db[TokenModel.get_collection_name()]
+    families_collection = db[TokenFamilyModel.get_collection_name()]
+    token_hash = TokenModel.hash_token(token_data.refresh_token)
+    now = datetime.utcnow()
     
-    stored_token = tokens_collection.find_one({
-        "token": token_data.refresh_token,
-        "revoked": False,
-        "expires_at": {"$gt": datetime.utcnow()}
-    })
-    
-    if not stored_token:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid or expired refresh token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Create new tokens
     access_token = create_access_token(
         data={"sub": decoded_token.user_id, "email": decoded_token.email}
     )
@@ -198,36 +179,97 @@ async def refresh_token(token_data: TokenRefresh):
         data={"sub": decoded_token.user_id, "email": decoded_token.email}
     )
     
-    # Revoke old refresh token
-    tokens_collection.update_one(
-        {"_id": stored_token["_id"]},
-        {"$set": {"revoked": True}}
-    )
-    
-    # Store new refresh token
-    new_refresh_token_doc = TokenModel.create_refresh_token(
-        user_id=decoded_token.user_id,
-        token=new_refresh_token,
-        expires_at=datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    )
-    tokens_collection.insert_one(new_refresh_token_doc)
+    async def rotate(session=None) -> Optional[dict]:
+        """Claim the presented token and insert its replacement."""
+        # Only a live, unrevoked row can be flipped to revoked
+        claimed = await tokens_collection.find_one_and_update(
+            {"token_hash": token_hash, "revoked": False, "expires_at": {"$gt": now}},
+            {"$set": {"revoked": True, "revoked_at": now}, "$unset": {"created_at": ""}},
+            projection={"family_id": 1},
+            return_document=ReturnDocument.BEFORE,
+            session=session
+        )
+        if not claimed:
+            return None
+        
+        # Store the new refresh token in the same family as the claimed one
+        new_token_doc = TokenModel.create_refresh_token(
+            user_id=decoded_token.user_id,
+            token=new_refresh_token,
+            expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+            family_id=claimed.get("family_id") or TokenModel.new_family_id()
+        )
+        await tokens_collection.insert_one(new_token_doc, session=session)
+        return new_token_doc
+    
+    if db_manager.supports_transactions:
+        async with await db.client.start_session() as session:
+            new_token_doc = await session.with_transaction(rotate)
+    else:
+        new_token_doc = await rotate()
+    
+    # The family may have been revoked while the rotation was in flight (a
+    # transaction does not stop reuse detection's delete_many from missing a
+    # row committed after it); withdraw the new token if so
+    if new_token_doc and await families_collection.find_one({"_id": new_token_doc["family_id"]}):
+        await tokens_collection.delete_one({"_id": new_token_doc["_id"]})
+        new_token_doc = None
+    
+    if not new_token_doc:
+        # A tombstone means the token was already rotated
+        reused_token = await tokens_collection.find_one(
+            {"token_hash": token_hash, "revoked": True},
+            {"family_id": 1, "revoked_at": 1}
+        )
+        if reused_token and reused_token.get("family_id"):
+            rotated_at = reused_token.get("revoked_at")
+            if rotated_at and rotated_at > now - timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS):
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Refresh token already used",
+                    headers={"WWW-Authenticate": "Bearer"},
+                )
+            
+            # Reuse: record the revocation first so an in-flight rotation of
+            # this family sees it, then remove every token of the family
+            family_id = reused_token["family_id"]
+            await families_collection.update_one(
+                {"_id": family_id},
+                {"$setOnInsert": TokenFamilyModel.create_revocation(
+                    user_id=decoded_token.user_id,
+                    expires_at=now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+                )},
+                upsert=True
+            )
+            await tokens_collection.delete_many({"family_id": family_id})
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Refresh token reuse detected; please log in again",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     
     return Token(access_token=access_token, refresh_token=new_refresh_token)
 
 
 @router.post("/logout", status_code=status.HTTP_200_OK)
 async def logout(token_data: TokenRefresh, current_user: dict = Depends(get_current_user)):
-    """Logout user by revoking refresh token."""
+    """Logout user by deleting their refresh token."""
     db = get_db()
     tokens_collection = db[TokenModel.get_collection_name()]
     
-    # Revoke the refresh token
-    result = tokens_collection.update_one(
-        {"token": token_data.refresh_token, "user_id": current_user["id"]},
-        {"$set": {"revoked": True}}
-    )
+    # Delete the refresh token outright rather than keeping a revoked row
+    result = await tokens_collection.delete_one({
+        "token_hash": TokenModel.hash_token(token_data.refresh_token),
+        "user_id": current_user["id"],
+        "revoked": False
+    })
     
-    if result.modified_count == 0:
+    if result.deleted_count == 0:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid refresh token"
@@ -257,7 +299,7 @@ async def update_user_profile(
     # Update username if provided
     if user_data.username is not None:
         # Check if new username is already taken by another user
-        existing = users_collection.find_one({
+        existing = await users_collection.find_one({
             "username": user_data.username,
             "_id": {"$ne": ObjectId(current_user["id"])}
         })
@@ -271,7 +313,7 @@ async def update_user_profile(
     # Update email if provided
     if user_data.email is not None:
         # Check if new email is already registered by another user
-        existing = users_collection.find_one({
+        existing = await users_collection.find_one({
             "email": user_data.email,
             "_id": {"$ne": ObjectId(current_user["id"])}
         })
@@ -291,14 +333,14 @@ async def update_user_profile(
             )
         
         # Verify current password
-        user = users_collection.find_one({"_id": ObjectId(current_user["id"])})
-        if not user or not verify_password(user_data.current_password, user["hashed_password"]):
+        user = await users_collection.find_one({"_id": ObjectId(current_user["id"])})
+        if not user or not await verify_password_async(user_data.current_password, user["hashed_password"]):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect current password"
             )
         
-        update_data["hashed_password"] = get_password_hash(user_data.new_password)
+        update_data["hashed_password"] = await get_password_hash_async(user_data.new_password)
     
     if not update_data:
         raise HTTPException(
@@ -308,13 +350,14 @@ async def update_user_profile(
     
     # Update user
     try:
-        users_collection.update_one(
+        await users_collection.update_one(
             {"_id": ObjectId(current_user["id"])},
             {"$set": update_data}
         )
+        invalidate_cached_user(current_user["id"])
         
         # Fetch and return updated user
-        updated_user = users_collection.find_one({"_id": ObjectId(current_user["id"])})
+        updated_user = await users_collection.find_one({"_id": ObjectId(current_user["id"])})
         return UserModel.to_dict(updated_user)
     
     except PyMongoError as e:
@@ -0,0 +1,71 @@
+import time
+from typing import AsyncIterator, Optional
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+
+from app.config import settings
+from app.utils.auth import get_current_user, get_token_from_header_or_query, get_token_payload
+from app.utils.events import Subscription, event_broker
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+# Sent just before the stream closes because the access token expired
+TOKEN_EXPIRED_EVENT = "event: token.expired\ndata: {}\n\n"
+
+
+async def _stream_events(
+    request: Request,
+    subscription: Subscription,
+    expires_at: Optional[float] = None
+) -> AsyncIterator[str]:
+    """Format queued events as Server-Sent Events until the client disconnects.
+    
+    The stream ends once the access token it was opened with expires.
+    """
+    try:
+        yield ": connected\n\n"
+        while not await request.is_disconnected():
+            timeout = settings.EVENT_HEARTBEAT_SECONDS
+            if expires_at is not None:
+                remaining = expires_at - time.time()
+                if remaining <= 0:
+                    yield TOKEN_EXPIRED_EVENT
+                    return
+                timeout = min(timeout, remaining)
+            
+            message = await subscription.get(timeout=timeout)
+            if message is None:
+                # Comment lines keep proxies from closing idle connections
+                yield ": keep-alive\n\n"
+                continue
+            yield message
+    finally:
+        subscription.close()
+
+
+@router.get("")
+@router.get("/")
+async def stream_events(
+    request: Request,
+    token: str = Depends(get_token_from_header_or_query)
+):
+    """Stream the authenticated user's task and label changes as Server-Sent Events.
+    
+    Event types are task.created, task.updated, task.deleted, label.created,
+    label.updated and label.deleted; each data payload is a JSON object with
+    the resource id and, for creates and updates, the new resource.
+    
+    The access token may be sent as a Bearer header or, for the browser
+    EventSource API which cannot set headers, as the access_token query
+    parameter. When the token expires a token.expired event is sent and the
+    stream closes; reconnect with a fresh token.
+    """
+    current_user = await get_current_user(token)
+    expires_at = get_token_payload(token).get("exp")
+    
+    subscription = event_broker.subscribe(current_user["id"])
+    return StreamingResponse(
+        _stream_events(request, subscription, expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
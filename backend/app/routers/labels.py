@@ -1,14 +1,26 @@
 from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request, Response
 from bson import ObjectId
-from pymongo.errors import PyMongoError
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
 
-from app.database import get_db
+from app.config import settings
+from app.database import db_manager, get_db
 from app.schemas.label import LabelCreate, LabelUpdate, LabelResponse
 from app.models.label import LabelModel
-from app.models.task import TaskModel
-from app.utils.auth import get_current_user
+from app.models.change_version import ChangeVersionModel
+from app.utils.auth import get_current_user, get_current_user_for_read
+from app.utils.versioning import bump_version, get_version, build_etag, etag_matches
+from app.utils.events import publish_event
+from app.utils.labels import (
+    get_user_labels,
+    invalidate_user_labels,
+    find_label_by_name,
+    count_label_tasks,
+    remove_label_from_tasks,
+    remove_label_from_tasks_in_background
+)
 
 router = APIRouter(prefix="/api/labels", tags=["Labels"])
 
@@ -23,18 +35,6 @@ async def create_label(
     db = get_db()
     labels_collection = db[LabelModel.get_collection_name()]
     
-    # Check if label with same name already exists for this user
-    existing = labels_collection.find_one({
-        "name": label_data.name,
-        "user_id": current_user["id"]
-    })
-    
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Label with this name already exists"
-        )
-    
     # Create label document
     label_doc = LabelModel.create_label(
         name=label_data.name,
@@ -43,11 +43,28 @@ async def create_label(
     )
     
     try:
-        result = labels_collection.insert_one(label_doc)
+        # Check for a label with the same name in the user's cached labels;
+        # the unique (user_id, name) index catches anything the cache misses
+        if await find_label_by_name(db, current_user["id"], label_data.name):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Label with this name already exists"
+            )
+        
+        result = await labels_collection.insert_one(label_doc)
         label_doc["_id"] = result.inserted_id
+        invalidate_user_labels(current_user["id"])
+        await bump_version(db, current_user["id"], ChangeVersionModel.LABELS)
         
-        return LabelModel.to_dict(label_doc)
+        label_dict = LabelModel.to_dict(label_doc)
+        await publish_event(current_user["id"], "label.created", label_dict["id"], label_dict)
+        return label_dict
     
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Label with this name already exists"
+        )
     except PyMongoError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -58,15 +75,25 @@ async def create_label(
 @router.get("", response_model=List[LabelResponse])
 @router.get("/", response_model=List[LabelResponse])
 async def get_labels(
-    current_user: dict = Depends(get_current_user)
+    request: Request,
+    response: Response,
+    current_user: dict = Depends(get_current_user_for_read)
 ):
-    """Get all labels for the authenticated user."""
+    """Get all labels for the authenticated user.
+    
+    Responses carry a weak ETag derived from the user's label change
+    counter; a matching If-None-Match is answered with 304.
+    """
     db = get_db()
-    labels_collection = db[LabelModel.get_collection_name()]
     
     try:
-        labels = list(labels_collection.find({"user_id": current_user["id"]}).sort("name", 1))
-        return [LabelModel.to_dict(label) for label in labels]
+        version = await get_version(db, current_user["id"], ChangeVersionModel.LABELS)
+        etag = build_etag(ChangeVersionModel.LABELS, version, current_user["id"], [])
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        
+        return await get_user_labels(db, current_user["id"], version)
     
     except PyMongoError as e:
         raise HTTPException(
@@ -78,14 +105,14 @@ async def get_labels(
 @router.get("/{label_id}", response_model=LabelResponse)
 async def get_label(
     label_id: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user_for_read)
 ):
     """Get a specific label by ID."""
     db = get_db()
     labels_collection = db[LabelModel.get_collection_name()]
     
     try:
-        label = labels_collection.find_one({
+        label = await labels_collection.find_one({
             "_id": ObjectId(label_id),
             "user_id": current_user["id"]
         })
@@ -118,32 +145,9 @@ async def update_label(
     labels_collection = db[LabelModel.get_collection_name()]
     
     try:
-        # Verify label exists and belongs to user
-        label = labels_collection.find_one({
-            "_id": ObjectId(label_id),
-            "user_id": current_user["id"]
-        })
-        
-        if not label:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Label not found"
-            )
-        
         # Build update data
         update_data = {}
         if label_data.name is not None:
-            # Check if new name conflicts with existing label
-            existing = labels_collection.find_one({
-                "name": label_data.name,
-                "user_id": current_user["id"],
-                "_id": {"$ne": ObjectId(label_id)}
-            })
-            if existing:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Label with this name already exists"
-                )
             update_data["name"] = label_data.name
         
         if label_data.color is not None:
@@ -155,16 +159,44 @@ async def update_label(
                 detail="No fields to update"
             )
         
-        # Update label
-        labels_collection.update_one(
-            {"_id": ObjectId(label_id)},
-            {"$set": update_data}
+        if label_data.name is not None:
+            existing = await find_label_by_name(db, current_user["id"], label_data.name)
+            if existing and existing["id"] != label_id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Label with this name already exists"
+                )
+        
+        # Update the label only if it belongs to the user; name conflicts the
+        # cache missed are rejected by the unique (user_id, name) index
+        updated_label = await labels_collection.find_one_and_update(
+            {"_id": ObjectId(label_id), "user_id": current_user["id"]},
+            {"$set": update_data},
+            return_document=ReturnDocument.AFTER
         )
         
-        # Fetch updated label
-        updated_label = labels_collection.find_one({"_id": ObjectId(label_id)})
-        return LabelModel.to_dict(updated_label)
+        if not updated_label:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Label not found"
+            )
+        
+        invalidate_user_labels(current_user["id"])
+        await bump_version(db, current_user["id"], ChangeVersionModel.LABELS)
+        label_dict = LabelModel.to_dict(updated_label)
+        await publish_event(current_user["id"], "label.updated", label_dict["id"], label_dict)
+        return label_dict
     
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Label with this name already exists"
+        )
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
     except Exception as e:
         if isinstance(e, HTTPException):
             raise
@@ -177,39 +209,77 @@ async def update_label(
 @router.delete("/{label_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_label(
     label_id: str,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user)
 ):
-    """Delete a label and remove it from all associated tasks."""
+    """Delete a label and remove it from all associated tasks.
+    
+    The label delete and the cascade run in one transaction when MongoDB is
+    a replica set; the driver retries transient transaction errors. For
+    labels on more than LABEL_CASCADE_BACKGROUND_THRESHOLD tasks, the
+    cascade runs in the background after the response is sent.
+    """
+    if not ObjectId.is_valid(label_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid label ID"
+        )
+    
     db = get_db()
     labels_collection = db[LabelModel.get_collection_name()]
-    tasks_collection = db[TaskModel.get_collection_name()]
+    label_filter = {"_id": ObjectId(label_id), "user_id": current_user["id"]}
     
     try:
-        # Verify label exists and belongs to user
-        result = labels_collection.delete_one({
-            "_id": ObjectId(label_id),
-            "user_id": current_user["id"]
-        })
+        # Decide up front whether the cascade is too large to run inline
+        defer_cascade = False
+        if settings.LABEL_CASCADE_BACKGROUND_THRESHOLD > 0:
+            task_count = await count_label_tasks(db, current_user["id"], label_id)
+            defer_cascade = task_count is not None and task_count > settings.LABEL_CASCADE_BACKGROUND_THRESHOLD
         
-        if result.deleted_count == 0:
+        label_deleted = False
+        
+        async def delete_and_cascade(session=None) -> int:
+            """Delete the label, then remove it from the tasks that reference it."""
+            nonlocal label_deleted
+            result = await labels_collection.delete_one(label_filter, session=session)
+            label_deleted = label_deleted or result.deleted_count > 0
+            if result.deleted_count and not defer_cascade:
+                await remove_label_from_tasks(db, current_user["id"], label_id, session=session)
+            return result.deleted_count
+        
+        try:
+            if db_manager.supports_transactions and not defer_cascade:
+                async with await db.client.start_session() as session:
+                    deleted_count = await session.with_transaction(delete_and_cascade)
+            else:
+                deleted_count = await delete_and_cascade()
+        finally:
+            # Even if the cascade failed after the label went, readers must
+            # stop seeing it; an extra bump after an aborted transaction is
+            # harmless
+            if label_deleted:
+                invalidate_user_labels(current_user["id"])
+                if defer_cascade:
+                    await bump_version(db, current_user["id"], ChangeVersionModel.LABELS)
+                else:
+                    await bump_version(db, current_user["id"], ChangeVersionModel.LABELS, ChangeVersionModel.TASKS)
+        
+        if deleted_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Label not found"
             )
         
-        # Remove label from all tasks
-        tasks_collection.update_many(
-            {"user_id": current_user["id"]},
-            {"$pull": {"label_ids": label_id}}
-        )
+        if defer_cascade:
+            background_tasks.add_task(remove_label_from_tasks_in_background, db, current_user["id"], label_id)
+        
+        await publish_event(current_user["id"], "label.deleted", label_id)
         
         return None
     
-    except Exception as e:
-        if isinstance(e, HTTPException):
-            raise
+    except PyMongoError as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid label ID"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
         )
 
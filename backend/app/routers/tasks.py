@@ -1,16 +1,220 @@
+import csv
+import io
 from datetime import datetime
-from typing import Optional, List
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import AsyncIterator, Optional, List, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
-from pymongo.errors import PyMongoError
+from bson.errors import InvalidId
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 
+from app.config import settings
 from app.database import get_db
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, PriorityEnum
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    PriorityEnum,
+    TaskSortField,
+    TaskStatsResponse,
+    TaskSummaryResponse,
+    partial_task_response,
+    partial_task_list_response,
+    BulkOperationType,
+    TaskBulkRequest,
+    TaskBulkItemResult,
+    TaskBulkResponse
+)
 from app.models.task import TaskModel
-from app.utils.auth import get_current_user
+from app.models.task_summary import TaskSummaryModel
+from app.models.change_version import ChangeVersionModel
+from app.utils.auth import get_current_user, get_current_user_for_read
+from app.utils.pagination import encode_cursor, decode_cursor, keyset_filter
+from app.utils.task_summary import apply_summary_delta, get_summary
+from app.utils.versioning import bump_version, get_versions, build_etag, etag_matches
+from app.utils.events import publish_event
+from app.utils.labels import resolve_labels, unknown_label_ids, validate_label_ids, expand_task_labels
+from app.utils.serialization import EXPANDED_TASK_FIELDS, dump_task, dump_tasks
 
 router = APIRouter(prefix="/api/tasks", tags=["Tasks"])
 
+# Change feed event emitted for each successful bulk operation
+BULK_EVENT_TYPES = {
+    BulkOperationType.CREATE: "task.created",
+    BulkOperationType.UPDATE: "task.updated",
+    BulkOperationType.COMPLETE: "task.updated",
+    BulkOperationType.DELETE: "task.deleted"
+}
+
+
+def _build_task_query(
+    user_id: str,
+    priority: Optional[PriorityEnum],
+    completed: Optional[bool],
+    labels: Optional[str],
+    overdue: Optional[bool]
+) -> dict:
+    """Build the MongoDB filter shared by task list and export endpoints."""
+    query = {"user_id": user_id}
+    
+    if priority:
+        query["priority"] = priority.value
+    
+    if completed is not None:
+        query["completed"] = completed
+    
+    if labels:
+        label_ids = [lid.strip() for lid in labels.split(",")]
+        query["label_ids"] = {"$in": label_ids}
+    
+    if overdue is not None:
+        query.setdefault("$and", []).append(TaskModel.overdue_filter(overdue))
+    
+    return query
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a sparse fieldset into TaskResponse field names (id is always kept)."""
+    if not fields:
+        return None
+    
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(TaskResponse.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    
+    requested.add("id")
+    return tuple(name for name in TaskResponse.model_fields if name in requested)
+
+
+def _parse_expand(expand: Optional[str]) -> bool:
+    """Parse the expand parameter; returns whether labels should be embedded."""
+    if not expand:
+        return False
+    
+    requested = {name.strip() for name in expand.split(",") if name.strip()}
+    unknown = requested - {"labels"}
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown expansions: {', '.join(sorted(unknown))}"
+        )
+    return "labels" in requested
+
+
+def _task_projection(field_names: Tuple[str, ...], *extra: str) -> dict:
+    """Build the MongoDB projection needed to serve a sparse fieldset."""
+    projection = {name: 1 for name in extra}
+    for name in field_names:
+        if name == "id":
+            continue
+        if name == "is_overdue":
+            projection["deadline"] = 1
+            projection["completed"] = 1
+        else:
+            projection[name] = 1
+    return projection
+
+
+def _json_response(content: bytes, response: Response) -> Response:
+    """Wrap pre-serialized JSON, keeping headers already set on the response."""
+    json_response = Response(content=content, media_type="application/json")
+    for header in ("ETag", "X-Next-Cursor"):
+        if header in response.headers:
+            json_response.headers[header] = response.headers[header]
+    return json_response
+
+
+def _partial_response(field_names: Tuple[str, ...], tasks: dict | List[dict], response: Response) -> Response:
+    """Serialize one task or a list through the trimmed schema for a fieldset."""
+    if isinstance(tasks, list):
+        adapter = partial_task_list_response(field_names)
+        content = adapter.dump_json(adapter.validate_python(tasks))
+    else:
+        content = partial_task_response(field_names).model_validate(tasks).model_dump_json()
+    return _json_response(content, response)
+
+
+def _expanded_response(field_names: Optional[Tuple[str, ...]], tasks: dict | List[dict], response: Response) -> Response:
+    """Serialize one task or a list with embedded labels (TaskExpandedResponse)."""
+    names = field_names + ("labels",) if field_names else EXPANDED_TASK_FIELDS
+    content = dump_tasks(tasks, names) if isinstance(tasks, list) else dump_task(tasks, names)
+    return _json_response(content, response)
+
+
+def _build_update_data(task_data: TaskUpdate) -> dict:
+    """Build a $set document from the fields provided in a task update."""
+    update_data = {}
+    if task_data.title is not None:
+        update_data["title"] = task_data.title
+    if task_data.description is not None:
+        update_data["description"] = task_data.description
+    if task_data.priority is not None:
+        update_data["priority"] = task_data.priority.value
+    if task_data.deadline is not None:
+        update_data["deadline"] = task_data.deadline
+    if task_data.completed is not None:
+        update_data["completed"] = task_data.completed
+    if task_data.label_ids is not None:
+        update_data["label_ids"] = task_data.label_ids
+    
+    update_data["updated_at"] = datetime.utcnow()
+    return update_data
+
+
+def _task_event_data(task: dict) -> dict:
+    """Build the change feed payload for a task document without mutating it."""
+    task_dict = TaskModel.to_dict(dict(task))
+    task_dict["is_overdue"] = TaskModel.is_overdue(task["deadline"], task["completed"])
+    return task_dict
+
+
+def _task_to_response(task: dict) -> TaskResponse:
+    """Convert a raw task document into its response schema."""
+    task_dict = TaskModel.to_dict(task)
+    task_dict["is_overdue"] = TaskModel.is_overdue(task["deadline"], task["completed"])
+    return TaskResponse.model_validate(task_dict)
+
+
+async def _stream_ndjson(tasks_cursor) -> AsyncIterator[str]:
+    """Stream tasks as newline-delimited JSON, one chunk per batch."""
+    lines = []
+    async for task in tasks_cursor:
+        lines.append(_task_to_response(task).model_dump_json())
+        if len(lines) >= settings.EXPORT_BATCH_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def _stream_csv(tasks_cursor) -> AsyncIterator[str]:
+    """Stream tasks as CSV with a header row, one chunk per batch."""
+    columns = list(TaskResponse.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+    
+    async for task in tasks_cursor:
+        task_data = _task_to_response(task).model_dump(mode="json")
+        task_data["label_ids"] = ";".join(task_data["label_ids"])
+        writer.writerow([task_data[column] for column in columns])
+        rows += 1
+        if rows >= settings.EXPORT_BATCH_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate(0)
+            rows = 0
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
 
 @router.post("", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
 @router.post("/", response_model=TaskResponse, status_code=status.HTTP_201_CREATED)
@@ -22,6 +226,14 @@ async def create_task(
     db = get_db()
     tasks_collection = db[TaskModel.get_collection_name()]
     
+    try:
+        await validate_label_ids(db, current_user["id"], task_data.label_ids)
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+    
     # Create task document
     task_doc = TaskModel.create_task(
         title=task_data.title,
@@ -33,12 +245,15 @@ async def create_task(
     )
     
     try:
-        result = tasks_collection.insert_one(task_doc)
+        result = await tasks_collection.insert_one(task_doc)
         task_doc["_id"] = result.inserted_id
+        await apply_summary_delta(db, current_user["id"], TaskSummaryModel.task_counters(task_doc))
+        await bump_version(db, current_user["id"], ChangeVersionModel.TASKS)
         
         task_dict = TaskModel.to_dict(task_doc)
         task_dict["is_overdue"] = TaskModel.is_overdue(task_doc["deadline"], task_doc["completed"])
         
+        await publish_event(current_user["id"], "task.created", task_dict["id"], task_dict)
         return task_dict
     
     except PyMongoError as e:
@@ -48,53 +263,352 @@ async def create_task(
         )
 
 
+@router.post("/bulk", response_model=TaskBulkResponse)
+async def bulk_tasks(
+    bulk_data: TaskBulkRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Apply a batch of create/update/delete/complete operations.
+    
+    Ownership of every referenced task is checked with one query and all
+    writes are sent in a single bulk_write. With ordered=true, execution
+    stops at the first failing operation and later ones are reported as
+    skipped.
+    """
+    db = get_db()
+    tasks_collection = db[TaskModel.get_collection_name()]
+    user_id = current_user["id"]
+    operations = bulk_data.operations
+    results: List[Optional[TaskBulkItemResult]] = [None] * len(operations)
+    
+    # Resolve referenced task IDs and load owned tasks in one round trip
+    object_ids = {}
+    for index, operation in enumerate(operations):
+        if operation.op == BulkOperationType.CREATE:
+            continue
+        try:
+            object_ids[index] = ObjectId(operation.id)
+        except (InvalidId, TypeError):
+            results[index] = TaskBulkItemResult(
+                index=index, op=operation.op, status="error", id=operation.id, error="Invalid task ID"
+            )
+    
+    try:
+        # Current state of each owned task, tracked as operations are queued
+        current_tasks = {}
+        if object_ids:
+            owned = tasks_collection.find(
+                {"_id": {"$in": list(set(object_ids.values()))}, "user_id": user_id},
+                {"completed": 1, "priority": 1, "label_ids": 1}
+            )
+            current_tasks = {task["_id"]: task async for task in owned}
+        
+        # Check every label ID referenced by creates and updates in one query
+        operation_label_ids = {}
+        for index, operation in enumerate(operations):
+            if operation.op == BulkOperationType.CREATE:
+                operation_label_ids[index] = operation.task.label_ids
+            elif operation.op == BulkOperationType.UPDATE and operation.update.label_ids:
+                operation_label_ids[index] = operation.update.label_ids
+        if operation_label_ids:
+            labels_by_id = await resolve_labels(
+                db, user_id, {label_id for label_ids in operation_label_ids.values() for label_id in label_ids}
+            )
+            for index, label_ids in operation_label_ids.items():
+                unknown = unknown_label_ids(label_ids, labels_by_id)
+                if unknown and results[index] is None:
+                    results[index] = TaskBulkItemResult(
+                        index=index,
+                        op=operations[index].op,
+                        status="error",
+                        id=operations[index].id,
+                        error=f"Unknown label IDs: {', '.join(unknown)}"
+                    )
+        
+        # Build write requests, remembering which operation each one came from
+        # and the summary counter change it causes
+        requests = []
+        request_indexes = []
+        request_counters = []
+        created_tasks = {}
+        for index, operation in enumerate(operations):
+            if results[index] is not None:
+                if bulk_data.ordered:
+                    break
+                continue
+            
+            if operation.op == BulkOperationType.CREATE:
+                task_doc = TaskModel.create_task(
+                    title=operation.task.title,
+                    description=operation.task.description,
+                    priority=operation.task.priority.value,
+                    deadline=operation.task.deadline,
+                    user_id=user_id,
+                    label_ids=operation.task.label_ids
+                )
+                task_doc["_id"] = ObjectId()
+                created_tasks[index] = task_doc
+                requests.append(InsertOne(task_doc))
+                request_counters.append(TaskSummaryModel.task_counters(task_doc))
+                object_ids[index] = task_doc["_id"]
+            elif object_ids[index] not in current_tasks:
+                results[index] = TaskBulkItemResult(
+                    index=index, op=operation.op, status="error", id=operation.id, error="Task not found"
+                )
+                if bulk_data.ordered:
+                    break
+                continue
+            elif operation.op == BulkOperationType.DELETE:
+                task = current_tasks.pop(object_ids[index])
+                requests.append(DeleteOne({"_id": object_ids[index], "user_id": user_id}))
+                request_counters.append(TaskSummaryModel.task_counters(task, -1))
+            else:
+                if operation.op == BulkOperationType.UPDATE:
+                    update_data = _build_update_data(operation.update)
+                else:
+                    update_data = {"completed": True, "updated_at": datetime.utcnow()}
+                task = current_tasks[object_ids[index]]
+                updated_task = {**task, **update_data}
+                current_tasks[object_ids[index]] = updated_task
+                requests.append(UpdateOne(
+                    {"_id": object_ids[index], "user_id": user_id},
+                    {"$set": update_data}
+                ))
+                request_counters.append(TaskSummaryModel.diff_counters(task, updated_task))
+            request_indexes.append(index)
+        
+        # Execute all writes at once and map failures back to operations
+        write_errors = {}
+        executed = len(requests)
+        if requests:
+            try:
+                await tasks_collection.bulk_write(requests, ordered=bulk_data.ordered)
+            except BulkWriteError as e:
+                for write_error in e.details.get("writeErrors", []):
+                    write_errors[write_error["index"]] = write_error.get("errmsg", "Write failed")
+                if bulk_data.ordered and write_errors:
+                    executed = min(write_errors) + 1
+        
+        applied_counters = []
+        for position, index in enumerate(request_indexes):
+            operation = operations[index]
+            task_id = str(object_ids[index])
+            if position in write_errors:
+                results[index] = TaskBulkItemResult(
+                    index=index, op=operation.op, status="error", id=task_id, error=write_errors[position]
+                )
+            elif position < executed:
+                results[index] = TaskBulkItemResult(index=index, op=operation.op, status="ok", id=task_id)
+                applied_counters.append(request_counters[position])
+        
+        await apply_summary_delta(db, user_id, TaskSummaryModel.merge_counters(*applied_counters))
+        if applied_counters:
+            await bump_version(db, user_id, ChangeVersionModel.TASKS)
+        
+        for index, operation in enumerate(operations):
+            if results[index] is None:
+                results[index] = TaskBulkItemResult(
+                    index=index,
+                    op=operation.op,
+                    status="skipped",
+                    id=operation.id,
+                    error="Not executed because an earlier operation failed"
+                )
+        
+        # Change feed events carry the new task for creates and updates, like
+        # the single-task endpoints; updated tasks are re-read in one query
+        updated_ids = {
+            object_ids[result.index] for result in results
+            if result.status == "ok" and result.op in (BulkOperationType.UPDATE, BulkOperationType.COMPLETE)
+        }
+        updated_tasks = {}
+        if updated_ids:
+            try:
+                updated = tasks_collection.find({"_id": {"$in": list(updated_ids)}, "user_id": user_id})
+                updated_tasks = {task["_id"]: task async for task in updated}
+            except PyMongoError as e:
+                print(f"WARNING: Could not load bulk-updated tasks for change events: {e}")
+        
+        for result in results:
+            if result.status != "ok":
+                continue
+            if result.op == BulkOperationType.CREATE:
+                task = created_tasks[result.index]
+            else:
+                task = updated_tasks.get(object_ids[result.index])
+            data = _task_event_data(task) if task else None
+            await publish_event(user_id, BULK_EVENT_TYPES[result.op], result.id, data)
+        
+        succeeded = sum(1 for result in results if result.status == "ok")
+        return TaskBulkResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+    
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+
 @router.get("", response_model=List[TaskResponse])
 @router.get("/", response_model=List[TaskResponse])
 async def get_tasks(
+    request: Request,
+    response: Response,
     priority: Optional[PriorityEnum] = None,
     completed: Optional[bool] = None,
     labels: Optional[str] = Query(None, description="Comma-separated label IDs"),
     overdue: Optional[bool] = None,
-    sort_by: Optional[str] = Query("created_at", description="Field to sort by"),
+    sort_by: Optional[TaskSortField] = Query(TaskSortField.CREATED_AT, description="Field to sort by"),
     order: Optional[str] = Query("desc", description="Sort order: asc or desc"),
-    current_user: dict = Depends(get_current_user)
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of tasks per page"),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return, e.g. title,deadline"),
+    expand: Optional[str] = Query(None, description="Set to 'labels' to embed each task's label name and color"),
+    current_user: dict = Depends(get_current_user_for_read)
 ):
-    """Get all tasks for the authenticated user with optional filters."""
+    """Get all tasks for the authenticated user with optional filters.
+    
+    When limit is given, results are paginated by keyset: the X-Next-Cursor
+    response header carries an opaque cursor for the next page and is
+    omitted on the last page.
+    
+    Responses carry a weak ETag derived from the user's task change counter;
+    a matching If-None-Match is answered with 304 before any task is read.
+    
+    With fields, only the listed fields are read from MongoDB and returned.
+    With expand=labels, each task also carries its labels' name and color,
+    resolved with one query for the whole page.
+    """
     db = get_db()
     tasks_collection = db[TaskModel.get_collection_name()]
+    field_names = _parse_fields(fields)
+    include_labels = _parse_expand(expand)
     
-    # Build query filter
-    query = {"user_id": current_user["id"]}
+    # Answer conditional requests from the change counters alone; expanded
+    # responses embed label names and colors, so label changes count too
+    scopes = [ChangeVersionModel.TASKS]
+    if include_labels:
+        scopes.append(ChangeVersionModel.LABELS)
+    try:
+        versions = await get_versions(db, current_user["id"], *scopes)
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+    etag_params = request.query_params.multi_items()
+    if include_labels:
+        etag_params.append(("labels_version", str(versions[ChangeVersionModel.LABELS])))
+    etag = build_etag(
+        ChangeVersionModel.TASKS,
+        versions[ChangeVersionModel.TASKS],
+        current_user["id"],
+        etag_params,
+        time_bucket_seconds=settings.ETAG_TIME_BUCKET_SECONDS
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     
-    if priority:
-        query["priority"] = priority.value
+    # Build query filter
+    query = _build_task_query(current_user["id"], priority, completed, labels, overdue)
     
-    if completed is not None:
-        query["completed"] = completed
+    # Sort configuration (_id breaks ties so pages are stable)
+    sort_field = (sort_by or TaskSortField.CREATED_AT).value
+    sort_order = 1 if order == "asc" else -1
     
-    if labels:
-        label_ids = [lid.strip() for lid in labels.split(",")]
-        query["label_ids"] = {"$in": label_ids}
+    if cursor:
+        try:
+            last_value, last_id = decode_cursor(cursor, sort_field, order)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+        query.setdefault("$and", []).append(keyset_filter(sort_field, sort_order, last_value, last_id))
     
-    # Sort configuration
-    sort_order = 1 if order == "asc" else -1
+    # The sort field is always projected so a next-page cursor can be built
+    extra_fields = (sort_field, "label_ids") if include_labels else (sort_field,)
+    projection = _task_projection(field_names, *extra_fields) if field_names else None
     
     try:
-        tasks = list(tasks_collection.find(query).sort(sort_by, sort_order))
+        tasks_cursor = tasks_collection.find(query, projection).sort([(sort_field, sort_order), ("_id", sort_order)])
+        if limit:
+            # Fetch one extra document to know whether another page exists
+            tasks = await tasks_cursor.limit(limit + 1).to_list(length=None)
+            if len(tasks) > limit:
+                tasks = tasks[:limit]
+                response.headers["X-Next-Cursor"] = encode_cursor(sort_field, order, tasks[-1])
+        else:
+            tasks = await tasks_cursor.to_list(length=None)
         
         # Convert to response format and add overdue status
         result = []
         for task in tasks:
+            task_dict = TaskModel.to_dict(task)
+            if field_names is None or "is_overdue" in field_names:
+                task_dict["is_overdue"] = TaskModel.is_overdue(task["deadline"], task["completed"])
+            result.append(task_dict)
+        
+        if include_labels:
+            await expand_task_labels(db, current_user["id"], result, versions[ChangeVersionModel.LABELS])
+            return _expanded_response(field_names, result, response)
+        if settings.FAST_JSON_RESPONSES:
+            return _json_response(dump_tasks(result, field_names), response)
+        if field_names:
+            return _partial_response(field_names, result, response)
+        return result
+    
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+
+@router.get("/search", response_model=List[TaskResponse])
+async def search_tasks(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200, description="Words or \"phrases\" to search for"),
+    priority: Optional[PriorityEnum] = None,
+    completed: Optional[bool] = None,
+    labels: Optional[str] = Query(None, description="Comma-separated label IDs"),
+    overdue: Optional[bool] = None,
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(0, ge=0, le=10000, description="Number of results to skip"),
+    expand: Optional[str] = Query(None, description="Set to 'labels' to embed each task's label name and color"),
+    current_user: dict = Depends(get_current_user_for_read)
+):
+    """Search task titles and descriptions, best matches first.
+    
+    Backed by the per-user text index on tasks and combinable with the same
+    filters as the task list.
+    """
+    db = get_db()
+    tasks_collection = db[TaskModel.get_collection_name()]
+    include_labels = _parse_expand(expand)
+    
+    query = _build_task_query(current_user["id"], priority, completed, labels, overdue)
+    query["$text"] = {"$search": q}
+    score = {"$meta": "textScore"}
+    
+    try:
+        tasks = await tasks_collection.find(query, {"score": score}).sort(
+            [("score", score), ("_id", -1)]
+        ).skip(offset).limit(limit).to_list(length=None)
+        
+        result = []
+        for task in tasks:
+            task.pop("score", None)
             task_dict = TaskModel.to_dict(task)
             task_dict["is_overdue"] = TaskModel.is_overdue(task["deadline"], task["completed"])
-            
-            # Apply overdue filter if specified
-            if overdue is not None:
-                if overdue == task_dict["is_overdue"]:
-                    result.append(task_dict)
-            else:
-                result.append(task_dict)
+            result.append(task_dict)
         
+        if include_labels:
+            await expand_task_labels(db, current_user["id"], result)
+            return _expanded_response(None, result, response)
+        if settings.FAST_JSON_RESPONSES:
+            return _json_response(dump_tasks(result), response)
         return result
     
     except PyMongoError as e:
@@ -104,20 +618,134 @@ async def get_tasks(
         )
 
 
+@router.get("/stats", response_model=TaskStatsResponse)
+async def get_task_stats(
+    current_user: dict = Depends(get_current_user_for_read)
+):
+    """Get task counts for the authenticated user, computed server-side."""
+    db = get_db()
+    tasks_collection = db[TaskModel.get_collection_name()]
+    
+    try:
+        facets = await tasks_collection.aggregate(
+            TaskModel.stats_pipeline(current_user["id"])
+        ).to_list(length=None)
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+    
+    facet = facets[0] if facets else {}
+    totals = facet.get("totals") or [{}]
+    total = totals[0].get("total", 0)
+    completed = totals[0].get("completed", 0)
+    
+    by_priority = {priority.value: 0 for priority in PriorityEnum}
+    for group in facet.get("by_priority", []):
+        by_priority[group["_id"]] = group["count"]
+    
+    return TaskStatsResponse(
+        total=total,
+        completed=completed,
+        pending=total - completed,
+        overdue=totals[0].get("overdue", 0),
+        by_priority=by_priority,
+        by_label={group["_id"]: group["count"] for group in facet.get("by_label", [])}
+    )
+
+
+@router.get("/summary", response_model=TaskSummaryResponse)
+async def get_task_summary(
+    current_user: dict = Depends(get_current_user_for_read)
+):
+    """Get the incrementally maintained task counters for the authenticated user.
+    
+    Reads a single pre-computed document, so the cost does not grow with
+    the number of tasks.
+    """
+    db = get_db()
+    
+    try:
+        summary = await get_summary(db, current_user["id"])
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+    
+    by_priority = {priority.value: 0 for priority in PriorityEnum}
+    by_priority.update({k: v for k, v in summary.get("by_priority", {}).items() if v})
+    
+    return TaskSummaryResponse(
+        total=summary.get("total", 0),
+        completed=summary.get("completed", 0),
+        pending=summary.get("total", 0) - summary.get("completed", 0),
+        by_priority=by_priority,
+        by_label={k: v for k, v in summary.get("by_label", {}).items() if v}
+    )
+
+
+@router.get("/export")
+async def export_tasks(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="Export format: ndjson or csv"),
+    priority: Optional[PriorityEnum] = None,
+    completed: Optional[bool] = None,
+    labels: Optional[str] = Query(None, description="Comma-separated label IDs"),
+    overdue: Optional[bool] = None,
+    sort_by: Optional[TaskSortField] = Query(TaskSortField.CREATED_AT, description="Field to sort by"),
+    order: Optional[str] = Query("desc", description="Sort order: asc or desc"),
+    current_user: dict = Depends(get_current_user_for_read)
+):
+    """Stream all matching tasks as NDJSON or CSV.
+    
+    Documents are read from the cursor in fixed-size batches and written out
+    as they arrive, so memory use does not grow with the number of tasks.
+    """
+    db = get_db()
+    tasks_collection = db[TaskModel.get_collection_name()]
+    
+    query = _build_task_query(current_user["id"], priority, completed, labels, overdue)
+    sort_field = (sort_by or TaskSortField.CREATED_AT).value
+    sort_order = 1 if order == "asc" else -1
+    
+    tasks_cursor = tasks_collection.find(query).sort(
+        [(sort_field, sort_order), ("_id", sort_order)]
+    ).batch_size(settings.EXPORT_BATCH_SIZE)
+    
+    if export_format == "csv":
+        return StreamingResponse(
+            _stream_csv(tasks_cursor),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="tasks.csv"'}
+        )
+    
+    return StreamingResponse(
+        _stream_ndjson(tasks_cursor),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tasks.ndjson"'}
+    )
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
-    current_user: dict = Depends(get_current_user)
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated task fields to return, e.g. title,deadline"),
+    expand: Optional[str] = Query(None, description="Set to 'labels' to embed each task's label name and color"),
+    current_user: dict = Depends(get_current_user_for_read)
 ):
-    """Get a specific task by ID."""
+    """Get a specific task by ID (expand=labels embeds label name and color)."""
     db = get_db()
     tasks_collection = db[TaskModel.get_collection_name()]
+    field_names = _parse_fields(fields)
+    include_labels = _parse_expand(expand)
     
     try:
-        task = tasks_collection.find_one({
-            "_id": ObjectId(task_id),
-            "user_id": current_user["id"]
-        })
+        task = await tasks_collection.find_one(
+            {"_id": ObjectId(task_id), "user_id": current_user["id"]},
+            _task_projection(field_names, *(("label_ids",) if include_labels else ())) if field_names else None
+        )
         
         if not task:
             raise HTTPException(
@@ -126,10 +754,21 @@ async def get_task(
             )
         
         task_dict = TaskModel.to_dict(task)
-        task_dict["is_overdue"] = TaskModel.is_overdue(task["deadline"], task["completed"])
+        if field_names is None or "is_overdue" in field_names:
+            task_dict["is_overdue"] = TaskModel.is_overdue(task["deadline"], task["completed"])
         
+        if include_labels:
+            await expand_task_labels(db, current_user["id"], [task_dict])
+            return _expanded_response(field_names, task_dict, response)
+        if field_names:
+            return _partial_response(field_names, task_dict, response)
         return task_dict
     
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
     except Exception as e:
         if isinstance(e, HTTPException):
             raise
@@ -150,11 +789,19 @@ async def update_task(
     tasks_collection = db[TaskModel.get_collection_name()]
     
     try:
-        # Verify task exists and belongs to user
-        task = tasks_collection.find_one({
-            "_id": ObjectId(task_id),
-            "user_id": current_user["id"]
-        })
+        if task_data.label_ids:
+            await validate_label_ids(db, current_user["id"], task_data.label_ids)
+        
+        # Build update data (only include fields that were provided)
+        update_data = _build_update_data(task_data)
+        
+        # Update the task only if it belongs to the user; the previous version
+        # is returned so summary counters can be adjusted by the difference
+        task = await tasks_collection.find_one_and_update(
+            {"_id": ObjectId(task_id), "user_id": current_user["id"]},
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE
+        )
         
         if not task:
             raise HTTPException(
@@ -162,36 +809,21 @@ async def update_task(
                 detail="Task not found"
             )
         
-        # Build update data (only include fields that were provided)
-        update_data = {}
-        if task_data.title is not None:
-            update_data["title"] = task_data.title
-        if task_data.description is not None:
-            update_data["description"] = task_data.description
-        if task_data.priority is not None:
-            update_data["priority"] = task_data.priority.value
-        if task_data.deadline is not None:
-            update_data["deadline"] = task_data.deadline
-        if task_data.completed is not None:
-            update_data["completed"] = task_data.completed
-        if task_data.label_ids is not None:
-            update_data["label_ids"] = task_data.label_ids
-        
-        update_data["updated_at"] = datetime.utcnow()
-        
-        # Update task
-        tasks_collection.update_one(
-            {"_id": ObjectId(task_id)},
-            {"$set": update_data}
-        )
+        updated_task = {**task, **update_data}
+        await apply_summary_delta(db, current_user["id"], TaskSummaryModel.diff_counters(task, updated_task))
+        await bump_version(db, current_user["id"], ChangeVersionModel.TASKS)
         
-        # Fetch updated task
-        updated_task = tasks_collection.find_one({"_id": ObjectId(task_id)})
         task_dict = TaskModel.to_dict(updated_task)
         task_dict["is_overdue"] = TaskModel.is_overdue(updated_task["deadline"], updated_task["completed"])
         
+        await publish_event(current_user["id"], "task.updated", task_dict["id"], task_dict)
         return task_dict
     
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
     except Exception as e:
         if isinstance(e, HTTPException):
             raise
@@ -211,11 +843,13 @@ async def toggle_task_completion(
     tasks_collection = db[TaskModel.get_collection_name()]
     
     try:
-        # Verify task exists and belongs to user
-        task = tasks_collection.find_one({
-            "_id": ObjectId(task_id),
-            "user_id": current_user["id"]
-        })
+        # Flip completion server-side so concurrent toggles cannot race
+        now = datetime.utcnow()
+        task = await tasks_collection.find_one_and_update(
+            {"_id": ObjectId(task_id), "user_id": current_user["id"]},
+            [{"$set": {"completed": {"$not": "$completed"}, "updated_at": now}}],
+            return_document=ReturnDocument.BEFORE
+        )
         
         if not task:
             raise HTTPException(
@@ -223,20 +857,21 @@ async def toggle_task_completion(
                 detail="Task not found"
             )
         
-        # Toggle completion
-        new_completed = not task["completed"]
-        tasks_collection.update_one(
-            {"_id": ObjectId(task_id)},
-            {"$set": {"completed": new_completed, "updated_at": datetime.utcnow()}}
-        )
+        updated_task = {**task, "completed": not task["completed"], "updated_at": now}
+        await apply_summary_delta(db, current_user["id"], TaskSummaryModel.diff_counters(task, updated_task))
+        await bump_version(db, current_user["id"], ChangeVersionModel.TASKS)
         
-        # Fetch updated task
-        updated_task = tasks_collection.find_one({"_id": ObjectId(task_id)})
         task_dict = TaskModel.to_dict(updated_task)
         task_dict["is_overdue"] = TaskModel.is_overdue(updated_task["deadline"], updated_task["completed"])
         
+        await publish_event(current_user["id"], "task.updated", task_dict["id"], task_dict)
         return task_dict
     
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
     except Exception as e:
         if isinstance(e, HTTPException):
             raise
@@ -256,19 +891,28 @@ async def delete_task(
     tasks_collection = db[TaskModel.get_collection_name()]
     
     try:
-        result = tasks_collection.delete_one({
+        task = await tasks_collection.find_one_and_delete({
             "_id": ObjectId(task_id),
             "user_id": current_user["id"]
         })
         
-        if result.deleted_count == 0:
+        if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Task not found"
             )
         
+        await apply_summary_delta(db, current_user["id"], TaskSummaryModel.task_counters(task, -1))
+        await bump_version(db, current_user["id"], ChangeVersionModel.TASKS)
+        await publish_event(current_user["id"], "task.deleted", task_id)
+        
         return None
     
+    except PyMongoError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
     except Exception as e:
         if isinstance(e, HTTPException):
             raise
@@ -1,6 +1,7 @@
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
+from pydantic import BaseModel, Field, TypeAdapter, create_model, model_validator
 from enum import Enum
 
 
@@ -11,6 +12,15 @@ class PriorityEnum(str, Enum):
     LOW = "Low"
 
 
+class TaskSortField(str, Enum):
+    """Fields tasks can be sorted and paginated by."""
+    CREATED_AT = "created_at"
+    UPDATED_AT = "updated_at"
+    DEADLINE = "deadline"
+    PRIORITY = "priority"
+    TITLE = "title"
+
+
 class TaskCreate(BaseModel):
     """Schema for task creation."""
     title: str = Field(..., min_length=1, max_length=200)
@@ -47,3 +57,102 @@ class TaskResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class TaskLabelResponse(BaseModel):
+    """Schema for a label embedded in a task with expand=labels."""
+    id: str
+    name: str
+    color: str
+
+
+class TaskExpandedResponse(TaskResponse):
+    """Schema for task response with its labels resolved."""
+    labels: List[TaskLabelResponse] = Field(default_factory=list)
+
+
+@lru_cache(maxsize=128)
+def partial_task_response(field_names: Tuple[str, ...]) -> type[BaseModel]:
+    """Get a TaskResponse schema trimmed to the given fields.
+    
+    Used for sparse fieldsets; schemas are cached per field combination.
+    """
+    fields = {
+        name: (TaskResponse.model_fields[name].annotation, TaskResponse.model_fields[name].default)
+        for name in field_names
+    }
+    return create_model("TaskPartialResponse", **fields)
+
+
+@lru_cache(maxsize=128)
+def partial_task_list_response(field_names: Tuple[str, ...]) -> TypeAdapter:
+    """Get a list adapter for the trimmed TaskResponse schema."""
+    return TypeAdapter(List[partial_task_response(field_names)])
+
+
+class TaskStatsResponse(BaseModel):
+    """Schema for aggregated task statistics."""
+    total: int
+    completed: int
+    pending: int
+    overdue: int
+    by_priority: Dict[str, int]
+    by_label: Dict[str, int]
+
+
+class TaskSummaryResponse(BaseModel):
+    """Schema for the incrementally maintained task counters."""
+    total: int
+    completed: int
+    pending: int
+    by_priority: Dict[str, int]
+    by_label: Dict[str, int]
+
+
+class BulkOperationType(str, Enum):
+    """Operations supported by the bulk task endpoint."""
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    COMPLETE = "complete"
+
+
+class TaskBulkOperation(BaseModel):
+    """Schema for a single operation in a bulk request."""
+    op: BulkOperationType
+    id: Optional[str] = None
+    task: Optional[TaskCreate] = None
+    update: Optional[TaskUpdate] = None
+    
+    @model_validator(mode="after")
+    def check_operation_fields(self) -> "TaskBulkOperation":
+        """Validate the fields required by each operation type."""
+        if self.op == BulkOperationType.CREATE and self.task is None:
+            raise ValueError("'task' is required for create operations")
+        if self.op != BulkOperationType.CREATE and self.id is None:
+            raise ValueError(f"'id' is required for {self.op.value} operations")
+        if self.op == BulkOperationType.UPDATE and self.update is None:
+            raise ValueError("'update' is required for update operations")
+        return self
+
+
+class TaskBulkRequest(BaseModel):
+    """Schema for a bulk task request."""
+    operations: List[TaskBulkOperation] = Field(..., min_length=1, max_length=1000)
+    ordered: bool = True
+
+
+class TaskBulkItemResult(BaseModel):
+    """Schema for the outcome of a single bulk operation."""
+    index: int
+    op: BulkOperationType
+    status: str
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class TaskBulkResponse(BaseModel):
+    """Schema for bulk task response."""
+    results: List[TaskBulkItemResult]
+    succeeded: int
+    failed: int
+
@@ -67,4 +67,5 @@ class TokenData(BaseModel):
     """Schema for token payload data."""
     user_id: Optional[str] = None
     email: Optional[str] = None
+    token_type: Optional[str] = None
 
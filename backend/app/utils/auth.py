@@ -1,8 +1,11 @@
+import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 import bcrypt
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from bson import ObjectId
 
@@ -10,9 +13,33 @@ from app.config import settings
 from app.database import get_db
 from app.schemas.user import TokenData
 from app.models.user import UserModel
+from app.utils.cache import TTLCache
+from app.utils.hashing import password_hash_pool
+
+try:
+    import jwt as pyjwt
+except ImportError:
+    pyjwt = None
+
+if settings.JWT_BACKEND == "pyjwt" and pyjwt is None:
+    raise RuntimeError("JWT_BACKEND=pyjwt requires the PyJWT package to be installed")
 
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token")
+# Same scheme for endpoints that also accept the token elsewhere
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/token", auto_error=False)
+
+# Per-process cache of user records keyed by user id
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS
+)
+
+# Per-process cache of verified token payloads keyed by token digest
+token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -30,6 +57,16 @@ def get_password_hash(password: str) -> str:
     return hashed.decode('utf-8')
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool without blocking the event loop."""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool without blocking the event loop."""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -53,17 +90,57 @@ def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None)
     else:
         expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # jti keeps tokens issued in the same second distinct
+    to_encode.update({"exp": expire, "type": "refresh", "jti": secrets.token_urlsafe(16)})
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
-def decode_token(token: str) -> TokenData:
-    """Decode and verify a JWT token."""
+def _verify_jwt(token: str) -> dict:
+    """Verify a JWT signature and expiry with the configured backend."""
+    if settings.JWT_BACKEND == "pyjwt":
+        try:
+            return pyjwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        except pyjwt.PyJWTError as e:
+            raise JWTError(str(e))
+    
+    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+
+def get_token_payload(token: str) -> dict:
+    """Return the verified payload of a JWT, reusing cached verifications.
+    
+    Cached payloads are keyed by a SHA-256 digest of the token and never
+    outlive the token's own exp claim.
+    """
+    if not settings.TOKEN_CACHE_ENABLED:
+        return _verify_jwt(token)
+    
+    token_digest = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(token_digest)
+    if payload is not None:
+        if payload.get("exp", 0) > time.time():
+            return payload
+        token_cache.invalidate(token_digest)
+    
+    payload = _verify_jwt(token)
+    
+    ttl = settings.TOKEN_CACHE_TTL_SECONDS
+    if "exp" in payload:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(token_digest, payload, ttl_seconds=ttl)
+    
+    return payload
+
+
+def decode_token(token: str, expected_type: Optional[str] = None) -> TokenData:
+    """Decode and verify a JWT token, optionally checking its type."""
     try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        payload = get_token_payload(token)
         user_id: str = payload.get("sub")
         email: str = payload.get("email")
+        token_type: str = payload.get("type")
         
         if user_id is None:
             raise HTTPException(
@@ -72,7 +149,14 @@ def decode_token(token: str) -> TokenData:
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return TokenData(user_id=user_id, email=email)
+        if expected_type is not None and token_type != expected_type:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token type",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        return TokenData(user_id=user_id, email=email, token_type=token_type)
     
     except JWTError:
         raise HTTPException(
@@ -84,13 +168,18 @@ def decode_token(token: str) -> TokenData:
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Get the current authenticated user from token."""
-    token_data = decode_token(token)
+    token_data = decode_token(token, expected_type="access")
+    
+    if settings.USER_CACHE_ENABLED:
+        cached_user = user_cache.get(token_data.user_id)
+        if cached_user is not None:
+            return dict(cached_user)
     
     try:
         db = get_db()
         users_collection = db[UserModel.get_collection_name()]
         
-        user = users_collection.find_one({"_id": ObjectId(token_data.user_id)})
+        user = await users_collection.find_one({"_id": ObjectId(token_data.user_id)})
         
         if user is None:
             raise HTTPException(
@@ -99,7 +188,11 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        return UserModel.to_dict(user)
+        user_dict = UserModel.to_dict(user)
+        if settings.USER_CACHE_ENABLED:
+            user_cache.set(token_data.user_id, dict(user_dict))
+        
+        return user_dict
     
     except Exception as e:
         raise HTTPException(
@@ -109,12 +202,42 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         )
 
 
-def verify_token_type(token: str, expected_type: str) -> bool:
-    """Verify the token type (access or refresh)."""
-    try:
-        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        token_type = payload.get("type")
-        return token_type == expected_type
-    except JWTError:
-        return False
+async def get_current_user_for_read(token: str = Depends(oauth2_scheme)):
+    """Get the caller for read-only endpoints.
+    
+    When AUTH_TRUST_TOKEN_CLAIMS is enabled the signed JWT claims are trusted
+    as-is and no user lookup is made; otherwise this behaves exactly like
+    get_current_user.
+    """
+    if settings.AUTH_TRUST_TOKEN_CLAIMS:
+        token_data = decode_token(token, expected_type="access")
+        return {"id": token_data.user_id, "email": token_data.email}
+    
+    return await get_current_user(token)
+
+
+def get_token_from_header_or_query(
+    header_token: Optional[str] = Depends(optional_oauth2_scheme),
+    access_token: Optional[str] = Query(
+        None,
+        description="Access token for clients that cannot send an Authorization header, such as the browser EventSource"
+    )
+) -> str:
+    """Get the bearer token from the Authorization header or the access_token query parameter.
+    
+    Query strings can end up in proxy and server logs, so only endpoints
+    that browsers cannot reach with a header should accept it.
+    """
+    token = header_token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return token
+
 
+def invalidate_cached_user(user_id: str):
+    """Drop a user from the authentication cache after their record changes."""
+    user_cache.invalidate(user_id)
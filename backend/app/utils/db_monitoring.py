@@ -0,0 +1,147 @@
+import threading
+import time
+from bisect import bisect_left
+from pymongo import monitoring
+
+# Upper bounds (milliseconds) of the latency histogram buckets; anything
+# slower falls into the final "+Inf" bucket
+LATENCY_BUCKETS_MS = [1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+
+class LatencyHistogram:
+    """Non-cumulative latency histogram with fixed millisecond buckets."""
+    
+    def __init__(self, buckets_ms: list[float] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.total = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, value_ms: float):
+        """Record a single observation."""
+        self.counts[bisect_left(self.buckets_ms, value_ms)] += 1
+        self.total += 1
+        self.sum_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+    
+    def snapshot(self) -> dict:
+        """Return bucket counts and summary figures."""
+        labels = [f"le_{bound}" for bound in self.buckets_ms] + ["le_inf"]
+        return {
+            "count": self.total,
+            "avg_ms": round(self.sum_ms / self.total, 3) if self.total else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip(labels, self.counts))
+        }
+
+
+class DatabaseMonitor(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Records driver command latency and connection pool usage.
+    
+    PyMongo invokes listeners from its own threads, so all state is guarded
+    by a lock. Registered on the client through event_listeners.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkout_started: dict[int, float] = {}
+        self.commands: dict[str, LatencyHistogram] = {}
+        self.command_failures: dict[str, int] = {}
+        self.checkout_wait = LatencyHistogram()
+        self.checkout_failures = 0
+        self.connections_open = 0
+        self.connections_in_use = 0
+        self.max_connections_in_use = 0
+    
+    # Command events
+    
+    def started(self, event):
+        pass
+    
+    def succeeded(self, event):
+        self._record_command(event.command_name, event.duration_micros)
+    
+    def failed(self, event):
+        self._record_command(event.command_name, event.duration_micros)
+        with self._lock:
+            self.command_failures[event.command_name] = self.command_failures.get(event.command_name, 0) + 1
+    
+    def _record_command(self, command_name: str, duration_micros: int):
+        with self._lock:
+            histogram = self.commands.get(command_name)
+            if histogram is None:
+                histogram = self.commands[command_name] = LatencyHistogram()
+            histogram.observe(duration_micros / 1000)
+    
+    # Connection pool events
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open = max(0, self.connections_open - 1)
+    
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._checkout_started[threading.get_ident()] = time.perf_counter()
+    
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._checkout_started.pop(threading.get_ident(), None)
+            self.checkout_failures += 1
+    
+    def connection_checked_out(self, event):
+        with self._lock:
+            started = self._checkout_started.pop(threading.get_ident(), None)
+            # PyMongo 4.7+ reports the wait directly; older drivers fall back
+            # to timing between check-out started and checked out
+            duration = getattr(event, "duration", None)
+            if duration is not None:
+                wait_ms = duration * 1000
+            elif started is not None:
+                wait_ms = (time.perf_counter() - started) * 1000
+            else:
+                wait_ms = None
+            if wait_ms is not None:
+                self.checkout_wait.observe(wait_ms)
+            self.connections_in_use += 1
+            self.max_connections_in_use = max(self.max_connections_in_use, self.connections_in_use)
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_in_use = max(0, self.connections_in_use - 1)
+    
+    def stats(self) -> dict:
+        """Return pool usage and per-command latency metrics."""
+        with self._lock:
+            return {
+                "connections_open": self.connections_open,
+                "connections_in_use": self.connections_in_use,
+                "max_connections_in_use": self.max_connections_in_use,
+                "checkout_wait": self.checkout_wait.snapshot(),
+                "checkout_failures": self.checkout_failures,
+                "commands": {name: histogram.snapshot() for name, histogram in sorted(self.commands.items())},
+                "command_failures": dict(self.command_failures)
+            }
+
+
+# Global database monitor instance
+db_monitor = DatabaseMonitor()
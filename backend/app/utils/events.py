@@ -0,0 +1,199 @@
+import asyncio
+import json
+from typing import Any, Optional
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis_asyncio = None
+
+
+class Subscription:
+    """A single subscriber's queue of formatted Server-Sent Events."""
+    
+    def __init__(self, broker: "InMemoryBroker", user_id: str, max_size: int):
+        self.broker = broker
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+    
+    async def get(self, timeout: float) -> Optional[str]:
+        """Wait for the next event, returning None if none arrives in time."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    def close(self):
+        """Stop receiving events."""
+        self.broker.unsubscribe(self)
+
+
+class InMemoryBroker:
+    """In-process pub/sub fanning events out to each user's subscribers.
+    
+    Only reaches subscribers connected to the same worker process; use a
+    shared broker such as RedisBroker when running several workers.
+    """
+    
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers: dict[str, set[Subscription]] = {}
+        self.published = 0
+        self.dropped = 0
+    
+    async def start(self):
+        """Start the broker."""
+    
+    async def stop(self):
+        """Stop the broker."""
+    
+    def subscribe(self, user_id: str) -> Subscription:
+        """Register a new subscriber for a user's events."""
+        subscription = Subscription(self, user_id, self.queue_size)
+        self.subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscriber."""
+        user_subscriptions = self.subscribers.get(subscription.user_id)
+        if user_subscriptions is None:
+            return
+        user_subscriptions.discard(subscription)
+        if not user_subscriptions:
+            del self.subscribers[subscription.user_id]
+    
+    def deliver(self, user_id: str, message: str):
+        """Hand a formatted event to every local subscriber of a user.
+        
+        Subscribers whose queue is full miss the event rather than slowing
+        down the publisher.
+        """
+        for subscription in self.subscribers.get(user_id, ()):
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self.dropped += 1
+    
+    async def publish(self, user_id: str, message: str):
+        """Publish a formatted event to a user's subscribers."""
+        self.published += 1
+        self.deliver(user_id, message)
+    
+    def stats(self) -> dict:
+        """Return subscriber and delivery metrics."""
+        return {
+            "broker": type(self).__name__,
+            "users": len(self.subscribers),
+            "subscribers": sum(len(subs) for subs in self.subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped
+        }
+
+
+class RedisBroker(InMemoryBroker):
+    """Pub/sub broker that shares events between workers through Redis.
+    
+    Events are published to a Redis channel per user; every worker listens
+    on the channel pattern and fans messages out to its local subscribers.
+    """
+    
+    CHANNEL_PREFIX = "todo:events:"
+    # Backoff between listener reconnection attempts, in seconds
+    RETRY_INITIAL_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+    
+    def __init__(self, queue_size: int, url: str):
+        super().__init__(queue_size)
+        if redis_asyncio is None:
+            raise RuntimeError("EVENT_BROKER=redis requires the redis package to be installed")
+        self.client = redis_asyncio.from_url(url)
+        self.listener: asyncio.Task | None = None
+        self.listener_restarts = 0
+        self._retry_delay = self.RETRY_INITIAL_DELAY
+    
+    async def start(self):
+        """Start listening for events published by any worker."""
+        self.listener = asyncio.create_task(self._listen())
+    
+    async def stop(self):
+        """Stop listening and close the Redis connection."""
+        if self.listener is not None:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except asyncio.CancelledError:
+                pass
+        await self.client.aclose()
+    
+    async def _listen(self):
+        """Relay messages from Redis, reconnecting with backoff on errors.
+        
+        Without this loop a single Redis error would silently stop event
+        delivery to every subscriber on this worker.
+        """
+        while True:
+            try:
+                await self._relay()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WARNING: Redis event listener failed: {e}; reconnecting in {self._retry_delay:g}s")
+            self.listener_restarts += 1
+            await asyncio.sleep(self._retry_delay)
+            self._retry_delay = min(self._retry_delay * 2, self.RETRY_MAX_DELAY)
+    
+    async def _relay(self):
+        """Subscribe to every user channel and relay messages to local subscribers."""
+        pubsub = self.client.pubsub()
+        try:
+            await pubsub.psubscribe(f"{self.CHANNEL_PREFIX}*")
+            self._retry_delay = self.RETRY_INITIAL_DELAY
+            async for message in pubsub.listen():
+                if message["type"] != "pmessage":
+                    continue
+                channel = message["channel"].decode("utf-8")
+                user_id = channel[len(self.CHANNEL_PREFIX):]
+                self.deliver(user_id, message["data"].decode("utf-8"))
+        finally:
+            await pubsub.aclose()
+    
+    async def publish(self, user_id: str, message: str):
+        """Publish a formatted event through Redis."""
+        self.published += 1
+        await self.client.publish(f"{self.CHANNEL_PREFIX}{user_id}", message)
+    
+    def stats(self) -> dict:
+        """Return subscriber, delivery and listener metrics."""
+        return {**super().stats(), "listener_restarts": self.listener_restarts}
+
+
+def create_event_broker() -> InMemoryBroker:
+    """Create the broker selected by EVENT_BROKER."""
+    if settings.EVENT_BROKER == "redis":
+        return RedisBroker(settings.EVENT_QUEUE_SIZE, settings.EVENT_BROKER_URL)
+    return InMemoryBroker(settings.EVENT_QUEUE_SIZE)
+
+
+# Global event broker instance
+event_broker = create_event_broker()
+
+
+async def publish_event(user_id: str, event_type: str, resource_id: str, data: Any = None):
+    """Publish a change event to a user's subscribers.
+    
+    The event is formatted as an SSE frame once, regardless of how many
+    subscribers receive it. Broker failures are logged rather than failing
+    the write.
+    """
+    event = {"type": event_type, "id": resource_id}
+    if data is not None:
+        event["data"] = jsonable_encoder(data)
+    message = f"event: {event_type}\ndata: {json.dumps(event)}\n\n"
+    
+    try:
+        await event_broker.publish(user_id, message)
+    except Exception as e:
+        print(f"WARNING: Could not publish {event_type} event for user {user_id}: {e}")
@@ -0,0 +1,77 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from fastapi import HTTPException, status
+
+from app.config import settings
+
+
+class PasswordHashPool:
+    """Runs bcrypt hashing and verification on a bounded worker pool.
+    
+    bcrypt releases the GIL, so a small thread pool keeps password work off
+    the event loop without starving other requests. Once every worker is busy
+    and the wait queue is full, new calls are rejected with 429 instead of
+    piling up behind a login storm.
+    """
+    
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.executor: ThreadPoolExecutor | None = None
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+    
+    def start(self):
+        """Create the worker pool."""
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hash"
+            )
+    
+    def shutdown(self):
+        """Stop the worker pool, waiting for in-flight work to finish."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+    
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking hashing function on the pool and await its result."""
+        if self.pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        
+        self.start()
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+    
+    def stats(self) -> dict:
+        """Return pool utilization metrics."""
+        busy = min(self.pending, self.max_workers)
+        return {
+            "workers": self.max_workers,
+            "busy": busy,
+            "queued": self.pending - busy,
+            "max_queue": self.max_queue,
+            "utilization": busy / self.max_workers,
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+
+# Global password hashing pool instance
+password_hash_pool = PasswordHashPool(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
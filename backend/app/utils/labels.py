@@ -0,0 +1,196 @@
+from typing import Iterable, List, Optional
+from bson import ObjectId
+from fastapi import HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorClientSession, AsyncIOMotorDatabase
+from pymongo.errors import PyMongoError
+
+from app.config import settings
+from app.models.label import LabelModel
+from app.models.task import TaskModel
+from app.models.task_summary import TaskSummaryModel
+from app.models.change_version import ChangeVersionModel
+from app.utils.cache import TTLCache
+from app.utils.versioning import bump_version, get_version
+
+# Per-process cache of each user's labels keyed by user id; entries hold the
+# label change counter they were read at and the labels sorted by name
+label_cache = TTLCache(
+    max_size=settings.LABEL_CACHE_MAX_SIZE,
+    ttl_seconds=settings.LABEL_CACHE_TTL_SECONDS
+)
+
+
+async def get_user_labels(db: AsyncIOMotorDatabase, user_id: str, version: Optional[int] = None) -> List[dict]:
+    """Get all of the user's labels sorted by name, from the cache when possible.
+    
+    A cached entry is only used if it was read at the user's current label
+    change counter, so labels written by another worker process are never
+    masked. Callers that already hold the counter can pass it as version.
+    """
+    if settings.LABEL_CACHE_ENABLED:
+        if version is None:
+            version = await get_version(db, user_id, ChangeVersionModel.LABELS)
+        cached = label_cache.get(user_id)
+        if cached is not None and cached[0] == version:
+            return [dict(label) for label in cached[1]]
+    
+    labels = await db[LabelModel.get_collection_name()].find({"user_id": user_id}).sort("name", 1).to_list(length=None)
+    labels = [LabelModel.to_dict(label) for label in labels]
+    if settings.LABEL_CACHE_ENABLED:
+        label_cache.set(user_id, (version, [dict(label) for label in labels]))
+    return labels
+
+
+def invalidate_user_labels(user_id: str):
+    """Drop a user's cached labels after one of them changes."""
+    label_cache.invalidate(user_id)
+
+
+async def find_label_by_name(db: AsyncIOMotorDatabase, user_id: str, name: str) -> Optional[dict]:
+    """Find one of the user's labels by name using the label cache.
+    
+    Returns None when the cache is disabled; the unique (user_id, name)
+    index still rejects conflicting writes in that case.
+    """
+    if not settings.LABEL_CACHE_ENABLED:
+        return None
+    return next((label for label in await get_user_labels(db, user_id) if label["name"] == name), None)
+
+
+async def load_labels(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    label_ids: Iterable[str],
+    version: Optional[int] = None
+) -> dict[str, dict]:
+    """Load the user's labels with the given IDs from the cache or one $in query.
+    
+    Returns a mapping of label ID to its id/name/color; IDs that are
+    malformed, missing or owned by another user are left out.
+    """
+    if settings.LABEL_CACHE_ENABLED:
+        wanted = set(label_ids)
+        return {
+            label["id"]: {"id": label["id"], "name": label["name"], "color": label["color"]}
+            for label in await get_user_labels(db, user_id, version)
+            if label["id"] in wanted
+        }
+    return await _query_labels(db, user_id, label_ids)
+
+
+async def _query_labels(db: AsyncIOMotorDatabase, user_id: str, label_ids: Iterable[str]) -> dict[str, dict]:
+    """Load the user's labels with the given IDs straight from MongoDB."""
+    object_ids = {ObjectId(label_id) for label_id in label_ids if ObjectId.is_valid(label_id)}
+    if not object_ids:
+        return {}
+    
+    labels = db[LabelModel.get_collection_name()].find(
+        {"_id": {"$in": list(object_ids)}, "user_id": user_id},
+        {"name": 1, "color": 1}
+    )
+    return {
+        str(label["_id"]): {"id": str(label["_id"]), "name": label["name"], "color": label["color"]}
+        async for label in labels
+    }
+
+
+def unknown_label_ids(label_ids: Iterable[str], labels_by_id: dict[str, dict]) -> List[str]:
+    """Get the label IDs that did not resolve to one of the user's labels."""
+    return sorted({label_id for label_id in label_ids if label_id not in labels_by_id})
+
+
+async def resolve_labels(db: AsyncIOMotorDatabase, user_id: str, label_ids: Iterable[str]) -> dict[str, dict]:
+    """Load labels for validation, confirming cache misses against MongoDB.
+    
+    Input is never rejected on the cache's word alone: IDs the cached list
+    does not know are looked up again with a direct $in query.
+    """
+    label_ids = set(label_ids)
+    labels_by_id = await load_labels(db, user_id, label_ids)
+    missing = unknown_label_ids(label_ids, labels_by_id)
+    if missing and settings.LABEL_CACHE_ENABLED:
+        labels_by_id.update(await _query_labels(db, user_id, missing))
+    return labels_by_id
+
+
+async def validate_label_ids(db: AsyncIOMotorDatabase, user_id: str, label_ids: List[str]):
+    """Raise a 400 unless every label ID refers to one of the user's labels."""
+    if not label_ids:
+        return
+    
+    unknown = unknown_label_ids(label_ids, await resolve_labels(db, user_id, label_ids))
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown label IDs: {', '.join(unknown)}"
+        )
+
+
+async def expand_task_labels(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    task_dicts: List[dict],
+    version: Optional[int] = None
+):
+    """Embed each task's labels (id, name, color) in place.
+    
+    All labels referenced by the page are resolved with a single query;
+    label IDs that no longer resolve are skipped.
+    """
+    labels_by_id = await load_labels(
+        db, user_id, {label_id for task in task_dicts for label_id in task.get("label_ids", [])}, version
+    )
+    for task in task_dicts:
+        task["labels"] = [
+            labels_by_id[label_id] for label_id in task.get("label_ids", []) if label_id in labels_by_id
+        ]
+
+
+async def remove_label_from_tasks(
+    db: AsyncIOMotorDatabase,
+    user_id: str,
+    label_id: str,
+    session: Optional[AsyncIOMotorClientSession] = None
+):
+    """Pull a deleted label from the tasks that reference it.
+    
+    Only tasks containing the label are matched (via the user_id/label_ids
+    multikey index), and the label's counter is dropped from the summary.
+    """
+    await db[TaskModel.get_collection_name()].update_many(
+        {"user_id": user_id, "label_ids": label_id},
+        {"$pull": {"label_ids": label_id}},
+        session=session
+    )
+    await db[TaskSummaryModel.get_collection_name()].update_one(
+        {"_id": user_id},
+        {"$unset": {f"by_label.{label_id}": ""}},
+        session=session
+    )
+
+
+async def count_label_tasks(db: AsyncIOMotorDatabase, user_id: str, label_id: str) -> Optional[int]:
+    """Get the number of tasks carrying a label from the user's task summary.
+    
+    Returns None when the user has no summary yet.
+    """
+    summary = await db[TaskSummaryModel.get_collection_name()].find_one(
+        {"_id": user_id},
+        {f"by_label.{label_id}": 1}
+    )
+    if summary is None:
+        return None
+    return summary.get("by_label", {}).get(label_id, 0)
+
+
+async def remove_label_from_tasks_in_background(db: AsyncIOMotorDatabase, user_id: str, label_id: str):
+    """Background variant of remove_label_from_tasks for very large accounts.
+    
+    Failures are logged rather than raised; tasks left holding the deleted
+    label ID are skipped by label expansion.
+    """
+    try:
+        await remove_label_from_tasks(db, user_id, label_id)
+        await bump_version(db, user_id, ChangeVersionModel.TASKS)
+    except PyMongoError as e:
+        print(f"WARNING: Could not remove label {label_id} from tasks of user {user_id}: {e}")
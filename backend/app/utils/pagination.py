@@ -0,0 +1,50 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Tuple
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def encode_cursor(sort_by: str, order: str, document: dict) -> str:
+    """Build an opaque keyset cursor pointing just past the given document."""
+    value = document[sort_by]
+    if isinstance(value, datetime):
+        value = {"$date": value.isoformat()}
+    
+    payload = {"s": sort_by, "o": order, "v": value, "id": str(document["_id"])}
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> Tuple[Any, ObjectId]:
+    """Decode a cursor into the last seen sort value and document ID.
+    
+    Raises ValueError if the cursor is malformed or was issued for a
+    different sort field or order.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        value = payload["v"]
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value["$date"])
+        last_id = ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+    
+    if payload.get("s") != sort_by or payload.get("o") != order:
+        raise ValueError("Cursor does not match the requested sort")
+    
+    return value, last_id
+
+
+def keyset_filter(sort_by: str, sort_order: int, value: Any, last_id: ObjectId) -> dict:
+    """Build the query predicate selecting documents after the cursor position."""
+    op = "$gt" if sort_order == 1 else "$lt"
+    return {
+        "$or": [
+            {sort_by: {op: value}},
+            {sort_by: value, "_id": {op: last_id}}
+        ]
+    }
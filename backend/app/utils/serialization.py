@@ -0,0 +1,57 @@
+import json
+from datetime import datetime
+from typing import Any, Iterable, List, Optional, Tuple
+from bson import ObjectId
+
+from app.schemas.task import TaskResponse, TaskExpandedResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Wire order of task fields, matching TaskResponse and TaskExpandedResponse
+TASK_FIELDS: Tuple[str, ...] = tuple(TaskResponse.model_fields)
+EXPANDED_TASK_FIELDS: Tuple[str, ...] = tuple(TaskExpandedResponse.model_fields)
+
+if orjson is not None:
+    # Z suffix for UTC datetimes matches Pydantic's JSON output
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _default(value: Any) -> Any:
+    """Encode BSON and datetime values the JSON encoder doesn't handle itself."""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize to compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _task_row(task: dict, names: Tuple[str, ...]) -> dict:
+    """Pick the response fields of a task dict in schema order."""
+    return {name: task.get(name, False if name == "is_overdue" else None) for name in names}
+
+
+def dump_task(task_dict: dict, field_names: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialize a single task dict like dump_tasks does for a list."""
+    return dumps(_task_row(task_dict, field_names or TASK_FIELDS))
+
+
+def dump_tasks(task_dicts: Iterable[dict], field_names: Optional[Tuple[str, ...]] = None) -> bytes:
+    """Serialize task dicts straight to JSON bytes without Pydantic validation.
+    
+    Produces the same wire format as List[TaskResponse] (or a sparse fieldset
+    of it): fields are emitted in schema order and anything else in the
+    document is dropped.
+    """
+    names = field_names or TASK_FIELDS
+    rows: List[dict] = [_task_row(task, names) for task in task_dicts]
+    return dumps(rows)
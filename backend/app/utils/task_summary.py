@@ -0,0 +1,131 @@
+from datetime import datetime
+from typing import Optional
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from app.models.task import TaskModel
+from app.models.user import UserModel
+from app.models.task_summary import TaskSummaryModel
+
+SUMMARY_FIELDS = ("total", "completed", "by_priority", "by_label")
+
+
+async def apply_summary_delta(db, user_id: str, counters: dict):
+    """Apply counter changes to a user's task summary with a single $inc.
+    
+    Summaries are created at registration (and backfilled for older users
+    by the reconciliation job), so this only touches an existing document.
+    Failures are logged rather than raised: the summary is derived data and
+    the reconciliation job repairs any drift.
+    """
+    if not counters:
+        return
+    
+    summaries_collection = db[TaskSummaryModel.get_collection_name()]
+    try:
+        await summaries_collection.update_one(
+            {"_id": user_id},
+            {"$inc": counters, "$set": {"updated_at": datetime.utcnow()}}
+        )
+    except PyMongoError as e:
+        print(f"WARNING: Could not update task summary for user {user_id}: {e}")
+
+
+async def compute_summary(db, user_id: str) -> dict:
+    """Recompute a user's summary document from the tasks collection."""
+    tasks_collection = db[TaskModel.get_collection_name()]
+    facets = await tasks_collection.aggregate(
+        TaskSummaryModel.rebuild_pipeline(user_id)
+    ).to_list(length=None)
+    
+    facet = facets[0] if facets else {}
+    totals = facet.get("totals") or [{}]
+    return TaskSummaryModel.create_summary(
+        user_id=user_id,
+        total=totals[0].get("total", 0),
+        completed=totals[0].get("completed", 0),
+        by_priority={group["_id"]: group["count"] for group in facet.get("by_priority", [])},
+        by_label={
+            group["_id"]: group["count"]
+            for group in facet.get("by_label", [])
+            if ObjectId.is_valid(group["_id"])
+        }
+    )
+
+
+async def create_empty_summary(db, user_id: str):
+    """Store the all-zero summary of a user who has no tasks yet."""
+    summaries_collection = db[TaskSummaryModel.get_collection_name()]
+    await summaries_collection.insert_one(TaskSummaryModel.create_summary(user_id=user_id))
+
+
+async def get_summary(db, user_id: str) -> dict:
+    """Get a user's stored summary.
+    
+    The read path never writes: storing a recomputed summary here could
+    race with a task write's $inc and count that task twice. Users not yet
+    backfilled by the reconciliation job get a recomputed, unstored summary.
+    """
+    summaries_collection = db[TaskSummaryModel.get_collection_name()]
+    summary = await summaries_collection.find_one({"_id": user_id})
+    if summary is None:
+        summary = await compute_summary(db, user_id)
+    return summary
+
+
+def _normalize(summary: Optional[dict]) -> dict:
+    """Strip zero counters so stored and recomputed summaries compare equal."""
+    summary = summary or {}
+    return {
+        "total": summary.get("total", 0),
+        "completed": summary.get("completed", 0),
+        "by_priority": {k: v for k, v in (summary.get("by_priority") or {}).items() if v},
+        "by_label": {k: v for k, v in (summary.get("by_label") or {}).items() if v}
+    }
+
+
+async def reconcile_summary(db, user_id: str) -> Optional[dict]:
+    """Rebuild one user's summary, returning the drift found or None.
+    
+    Users registered before summaries existed have none stored; theirs is
+    created here and reported with stored set to None.
+    """
+    summaries_collection = db[TaskSummaryModel.get_collection_name()]
+    stored = await summaries_collection.find_one({"_id": user_id})
+    expected = await compute_summary(db, user_id)
+    if stored is None:
+        expected_fields = {key: value for key, value in expected.items() if key != "_id"}
+        # Never overwrite a summary registration created in the meantime
+        await summaries_collection.update_one(
+            {"_id": user_id},
+            {"$setOnInsert": expected_fields},
+            upsert=True
+        )
+        return {
+            "user_id": user_id,
+            "stored": None,
+            "expected": _normalize(expected)
+        }
+    
+    stored_counts = _normalize(stored)
+    expected_counts = _normalize(expected)
+    if stored_counts == expected_counts:
+        return None
+    
+    await summaries_collection.replace_one({"_id": user_id}, expected)
+    return {
+        "user_id": user_id,
+        "stored": stored_counts,
+        "expected": expected_counts
+    }
+
+
+async def reconcile_all_summaries(db) -> list[dict]:
+    """Rebuild every user's summary and report the users whose counts drifted."""
+    users_collection = db[UserModel.get_collection_name()]
+    drifted = []
+    async for user in users_collection.find({}, {"_id": 1}):
+        drift = await reconcile_summary(db, str(user["_id"]))
+        if drift:
+            drifted.append(drift)
+    return drifted
@@ -0,0 +1,67 @@
+import hashlib
+import time
+from typing import Iterable, Optional
+
+from app.models.change_version import ChangeVersionModel
+
+
+async def bump_version(db, user_id: str, *scopes: str):
+    """Increment the change counters for the given scopes of a user.
+    
+    Errors are raised: ETags and label caches trust these counters, so a
+    write whose bump failed must not be reported as a success.
+    """
+    versions_collection = db[ChangeVersionModel.get_collection_name()]
+    await versions_collection.update_one(
+        {"_id": user_id},
+        {"$inc": {scope: 1 for scope in scopes}},
+        upsert=True
+    )
+
+
+async def get_version(db, user_id: str, scope: str) -> int:
+    """Get the current change counter for a scope of a user."""
+    versions_collection = db[ChangeVersionModel.get_collection_name()]
+    versions = await versions_collection.find_one({"_id": user_id}, {scope: 1})
+    return (versions or {}).get(scope, 0)
+
+
+async def get_versions(db, user_id: str, *scopes: str) -> dict[str, int]:
+    """Get the current change counters for several scopes of a user at once."""
+    versions_collection = db[ChangeVersionModel.get_collection_name()]
+    versions = await versions_collection.find_one({"_id": user_id}, {scope: 1 for scope in scopes}) or {}
+    return {scope: versions.get(scope, 0) for scope in scopes}
+
+
+def build_etag(
+    scope: str,
+    version: int,
+    user_id: str,
+    params: Iterable[tuple],
+    time_bucket_seconds: Optional[int] = None
+) -> str:
+    """Build a weak ETag for a list response.
+    
+    The tag changes whenever the user's change counter moves, when the
+    query parameters differ, and, if a time bucket is given, when the bucket
+    rolls over so time-derived fields such as is_overdue are refreshed.
+    """
+    key = [user_id, str(sorted(params))]
+    if time_bucket_seconds:
+        key.append(str(int(time.time() // time_bucket_seconds)))
+    digest = hashlib.sha1("|".join(key).encode("utf-8")).hexdigest()[:16]
+    return f'W/"{scope}-{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    
+    opaque_tag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == opaque_tag:
+            return True
+    return False
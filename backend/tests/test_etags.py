@@ -0,0 +1,57 @@
+def _first_label_id(client, headers) -> str:
+    return client.get("/api/labels", headers=headers).json()[0]["id"]
+
+
+def test_task_list_answers_304_until_tasks_change(client, auth_headers, create_task):
+    create_task()
+    etag = client.get("/api/tasks", headers=auth_headers).headers["ETag"]
+    
+    assert client.get("/api/tasks", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    
+    create_task(title="New", priority="High")
+    assert client.get("/api/tasks", headers={**auth_headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_expanded_task_list_etag_follows_label_changes(client, auth_headers, create_task):
+    """Renaming a label invalidates cached expand=labels responses."""
+    label_id = _first_label_id(client, auth_headers)
+    create_task(label_ids=[label_id])
+    response = client.get("/api/tasks?expand=labels", headers=auth_headers)
+    etag = response.headers["ETag"]
+    assert client.get("/api/tasks?expand=labels", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+    
+    assert client.put(f"/api/labels/{label_id}", headers=auth_headers, json={"name": "Renamed"}).status_code == 200
+    
+    response = client.get("/api/tasks?expand=labels", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()[0]["labels"][0]["name"] == "Renamed"
+
+
+def test_plain_task_list_etag_ignores_label_changes(client, auth_headers, create_task):
+    label_id = _first_label_id(client, auth_headers)
+    create_task(label_ids=[label_id])
+    etag = client.get("/api/tasks", headers=auth_headers).headers["ETag"]
+    
+    client.put(f"/api/labels/{label_id}", headers=auth_headers, json={"color": "#FFFFFF"})
+    
+    assert client.get("/api/tasks", headers={**auth_headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_failed_version_bump_fails_the_write(client, auth_headers, monkeypatch):
+    """A write whose change counter could not move is reported as a 500."""
+    from mongomock_motor import AsyncMongoMockCollection
+    from pymongo.errors import OperationFailure
+    from app.models.change_version import ChangeVersionModel
+    
+    update_one = AsyncMongoMockCollection.update_one
+    
+    async def failing_update_one(self, *args, **kwargs):
+        if self.name == ChangeVersionModel.get_collection_name():
+            raise OperationFailure("counter write failed")
+        return await update_one(self, *args, **kwargs)
+    monkeypatch.setattr(AsyncMongoMockCollection, "update_one", failing_update_one)
+    
+    label_id = client.get("/api/labels", headers=auth_headers).json()[0]["id"]
+    response = client.put(f"/api/labels/{label_id}", headers=auth_headers, json={"name": "Renamed"})
+    
+    assert response.status_code == 500 and "Database error" in response.json()["detail"]
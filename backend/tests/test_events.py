@@ -0,0 +1,165 @@
+import asyncio
+import json
+
+from app.utils import events
+from app.utils.events import RedisBroker, event_broker
+
+
+def _drain(subscription) -> list[dict]:
+    """Parse every queued SSE frame into its JSON payload."""
+    frames = []
+    while not subscription.queue.empty():
+        message = subscription.queue.get_nowait()
+        frames.append(json.loads(message.split("data: ", 1)[1]))
+    return frames
+
+
+def test_bulk_events_carry_the_new_tasks(client, auth_headers, create_task):
+    user_id = client.get("/api/auth/me", headers=auth_headers).json()["id"]
+    existing = create_task(title="Existing")["id"]
+    subscription = event_broker.subscribe(user_id)
+    
+    try:
+        response = client.post("/api/tasks/bulk", headers=auth_headers, json={"operations": [
+            {"op": "create", "task": {"title": "Bulk", "priority": "High", "deadline": "2099-01-01T00:00:00Z"}},
+            {"op": "update", "id": existing, "update": {"title": "Renamed"}},
+            {"op": "delete", "id": existing}
+        ]})
+        assert response.status_code == 200, response.text
+        frames = _drain(subscription)
+    finally:
+        subscription.close()
+    
+    assert [frame["type"] for frame in frames] == ["task.created", "task.updated", "task.deleted"]
+    assert frames[0]["data"]["title"] == "Bulk" and frames[0]["data"]["id"] == frames[0]["id"]
+    assert "is_overdue" in frames[0]["data"] and "_id" not in frames[0]["data"]
+    # Delete events only carry the id
+    assert "data" not in frames[2]
+
+
+def test_bulk_update_event_matches_single_update_payload(client, auth_headers, create_task):
+    user_id = client.get("/api/auth/me", headers=auth_headers).json()["id"]
+    task_id = create_task(title="Existing")["id"]
+    subscription = event_broker.subscribe(user_id)
+    
+    try:
+        client.post("/api/tasks/bulk", headers=auth_headers, json={"operations": [
+            {"op": "complete", "id": task_id}
+        ]})
+        frames = _drain(subscription)
+    finally:
+        subscription.close()
+    
+    stored = client.get(f"/api/tasks/{task_id}", headers=auth_headers).json()
+    assert frames[0]["data"] == stored
+
+
+class _FailingPubSub:
+    """Redis pub/sub stand-in whose listen fails on the first connection."""
+    
+    connections = 0
+    
+    async def psubscribe(self, pattern):
+        type(self).connections += 1
+    
+    async def listen(self):
+        if type(self).connections == 1:
+            raise ConnectionError("connection reset")
+        yield {"type": "pmessage", "channel": b"todo:events:user-1", "data": b"event: x\\n\\n"}
+        await asyncio.Event().wait()
+    
+    async def aclose(self):
+        pass
+
+
+class _FakeRedisClient:
+    def pubsub(self):
+        return _FailingPubSub()
+    
+    async def aclose(self):
+        pass
+
+
+class _FakeRedisModule:
+    @staticmethod
+    def from_url(url):
+        return _FakeRedisClient()
+
+
+def test_redis_listener_reconnects_after_errors(monkeypatch):
+    monkeypatch.setattr(events, "redis_asyncio", _FakeRedisModule)
+    monkeypatch.setattr(RedisBroker, "RETRY_INITIAL_DELAY", 0)
+    
+    async def run():
+        broker = RedisBroker(queue_size=10, url="redis://test")
+        subscription = broker.subscribe("user-1")
+        await broker.start()
+        message = await subscription.get(timeout=1)
+        await broker.stop()
+        return broker, message
+    
+    broker, message = asyncio.run(run())
+    
+    assert message is not None
+    assert broker.stats()["listener_restarts"] == 1
+    assert broker.listener.cancelled()
+
+
+def test_thousands_of_idle_subscribers_stay_cheap():
+    """5,000 waiting subscribers fit in a small fixed budget and only the target user wakes."""
+    import tracemalloc
+    from app.utils.events import InMemoryBroker
+    
+    subscribers, users = 5000, 1000
+    
+    async def run():
+        broker = InMemoryBroker(queue_size=100)
+        tracemalloc.start()
+        try:
+            baseline = tracemalloc.get_traced_memory()[0]
+            subscriptions = [broker.subscribe(f"user-{i % users}") for i in range(subscribers)]
+            waiters = [asyncio.create_task(subscription.get(timeout=5)) for subscription in subscriptions]
+            await asyncio.sleep(0)
+            per_subscriber = (tracemalloc.get_traced_memory()[0] - baseline) / subscribers
+        finally:
+            tracemalloc.stop()
+        
+        await broker.publish("user-7", "event: task.created\ndata: {}\n\n")
+        woken = await asyncio.gather(*[waiters[i] for i in range(7, subscribers, users)])
+        still_idle = sum(1 for waiter in waiters if not waiter.done())
+        
+        for waiter in waiters:
+            waiter.cancel()
+        for subscription in subscriptions:
+            subscription.close()
+        return per_subscriber, woken, still_idle, broker.stats()
+    
+    per_subscriber, woken, still_idle, stats = asyncio.run(run())
+    
+    print(f"\n{per_subscriber:.0f} bytes per idle subscriber (queue and waiting task)")
+    assert per_subscriber < 16 * 1024
+    assert woken == ["event: task.created\ndata: {}\n\n"] * (subscribers // users)
+    assert still_idle == subscribers - subscribers // users
+    assert stats["subscribers"] == 0 and stats["users"] == 0
+
+
+def test_feed_accepts_a_query_token_and_closes_when_it_expires(client, tokens):
+    from datetime import timedelta
+    from app.utils.auth import create_access_token
+    
+    user = client.get("/api/auth/me", headers={"Authorization": f"Bearer {tokens['access_token']}"}).json()
+    short_lived = create_access_token({"sub": user["id"], "email": user["email"]}, expires_delta=timedelta(seconds=2))
+    
+    # EventSource cannot set headers, so the token travels in the query string
+    with client.stream("GET", f"/api/events?access_token={short_lived}") as response:
+        assert response.status_code == 200
+        body = "".join(response.iter_text())
+    
+    assert body.startswith(": connected")
+    assert body.endswith("event: token.expired\ndata: {}\n\n")
+    assert event_broker.stats()["subscribers"] == 0
+
+
+def test_feed_requires_a_token(client):
+    assert client.get("/api/events").status_code == 401
+    assert client.get("/api/events?access_token=garbage").status_code == 401
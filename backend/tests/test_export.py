@@ -0,0 +1,115 @@
+import asyncio
+import csv
+import io
+import json
+import tracemalloc
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+
+from app.config import settings
+from app.routers.tasks import _stream_csv, _stream_ndjson
+from app.schemas.task import TaskResponse
+
+
+def _task_docs(count: int):
+    """Yield synthetic task documents without holding them all in memory."""
+    deadline = datetime.utcnow() + timedelta(days=1)
+    for i in range(count):
+        yield {
+            "_id": ObjectId(),
+            "title": f"Task {i}",
+            "description": "x" * 100,
+            "priority": "Medium",
+            "deadline": deadline,
+            "completed": bool(i % 2),
+            "label_ids": [],
+            "user_id": "user",
+            "created_at": deadline,
+            "updated_at": deadline
+        }
+
+
+async def _cursor(count: int):
+    for doc in _task_docs(count):
+        yield doc
+
+
+def _collect(stream) -> list[str]:
+    async def run():
+        return [chunk async for chunk in stream]
+    return asyncio.run(run())
+
+
+def test_ndjson_export_matches_task_list(client, auth_headers, create_task):
+    for i in range(3):
+        create_task(title=f"Task {i}")
+    
+    response = client.get("/api/tasks/export", headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == client.get("/api/tasks", headers=auth_headers).json()
+
+
+def test_export_reuses_task_list_filters(client, auth_headers, create_task):
+    label_id = client.get("/api/labels", headers=auth_headers).json()[0]["id"]
+    create_task(title="High", priority="High", label_ids=[label_id])
+    create_task(title="Low")
+    
+    for params in ("priority=High", f"labels={label_id}", "completed=false", "sort_by=title&order=asc"):
+        exported = [
+            json.loads(line)
+            for line in client.get(f"/api/tasks/export?{params}", headers=auth_headers).text.splitlines()
+        ]
+        assert exported == client.get(f"/api/tasks?{params}", headers=auth_headers).json(), params
+
+
+def test_csv_export(client, auth_headers, create_task):
+    label_ids = [label["id"] for label in client.get("/api/labels", headers=auth_headers).json()[:2]]
+    task = create_task(title="Labelled", label_ids=label_ids)
+    
+    response = client.get("/api/tasks/export?format=csv", headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert list(rows[0]) == list(TaskResponse.model_fields)
+    assert rows[0]["id"] == task["id"] and rows[0]["title"] == "Labelled"
+    assert rows[0]["label_ids"] == ";".join(label_ids)
+
+
+def test_export_is_chunked_by_batch_size(monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    
+    ndjson_chunks = _collect(_stream_ndjson(_cursor(5)))
+    csv_chunks = _collect(_stream_csv(_cursor(5)))
+    
+    assert [chunk.count("\n") for chunk in ndjson_chunks] == [2, 2, 1]
+    # The header row travels with the first batch
+    assert [chunk.count("\r\n") for chunk in csv_chunks] == [3, 2, 1]
+
+
+def test_export_memory_stays_flat_as_task_count_grows():
+    """Peak memory of a 50k-task export matches a 5k one (500k scaled down for CI)."""
+    def peak_and_size(count: int) -> tuple[int, int]:
+        async def run():
+            size = 0
+            async for chunk in _stream_ndjson(_cursor(count)):
+                size += len(chunk)
+            return size
+        
+        tracemalloc.start()
+        try:
+            size = asyncio.run(run())
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        return peak, size
+    
+    small_peak, _ = peak_and_size(5_000)
+    large_peak, large_size = peak_and_size(50_000)
+    
+    assert large_peak < small_peak * 1.5
+    assert large_peak < large_size / 10
@@ -0,0 +1,104 @@
+from bson import ObjectId
+
+from app.models.change_version import ChangeVersionModel
+from app.models.label import LabelModel
+from app.utils.labels import label_cache
+from app.utils.versioning import bump_version
+
+
+def _user_id(client, headers) -> str:
+    return client.get("/api/auth/me", headers=headers).json()["id"]
+
+
+def test_label_list_is_served_from_cache(client, auth_headers):
+    first = client.get("/api/labels", headers=auth_headers).json()
+    hits = label_cache.stats()["hits"]
+    assert client.get("/api/labels", headers=auth_headers).json() == first
+    assert label_cache.stats()["hits"] == hits + 1
+
+
+def test_label_created_by_another_worker_is_accepted(client, db, auth_headers, create_task):
+    """A label inserted behind the cache's back still validates."""
+    client.get("/api/labels", headers=auth_headers)
+    user_id = _user_id(client, auth_headers)
+    
+    async def insert_label():
+        result = await db[LabelModel.get_collection_name()].insert_one(
+            LabelModel.create_label(name="Elsewhere", color="#123456", user_id=user_id)
+        )
+        return str(result.inserted_id)
+    label_id = client.portal.call(insert_label)
+    
+    create_task(label_ids=[label_id])
+
+
+def test_label_deleted_by_another_worker_is_rejected(client, db, auth_headers, create_task):
+    """A label removed by another worker (which bumps the counter) fails validation."""
+    label_id = client.get("/api/labels", headers=auth_headers).json()[0]["id"]
+    user_id = _user_id(client, auth_headers)
+    
+    async def delete_label():
+        await db[LabelModel.get_collection_name()].delete_one({"_id": ObjectId(label_id)})
+        await bump_version(db, user_id, ChangeVersionModel.LABELS)
+    client.portal.call(delete_label)
+    
+    create_task(label_ids=[label_id], expected_status=400)
+    assert label_id not in [label["id"] for label in client.get("/api/labels", headers=auth_headers).json()]
+
+
+def test_label_writes_invalidate_cache(client, auth_headers, create_task):
+    client.get("/api/labels", headers=auth_headers)
+    created = client.post("/api/labels", headers=auth_headers, json={"name": "Fresh", "color": "#000000"})
+    assert created.status_code == 201
+    assert client.post("/api/labels", headers=auth_headers, json={"name": "Fresh", "color": "#000000"}).status_code == 400
+    
+    label_id = created.json()["id"]
+    assert client.put(f"/api/labels/{label_id}", headers=auth_headers, json={"name": "Renamed"}).status_code == 200
+    names = [label["name"] for label in client.get("/api/labels", headers=auth_headers).json()]
+    assert "Renamed" in names and "Fresh" not in names
+    
+    assert client.delete(f"/api/labels/{label_id}", headers=auth_headers).status_code == 204
+    create_task(label_ids=[label_id], expected_status=400)
+
+
+def test_label_delete_removes_label_from_tasks(client, auth_headers, create_task):
+    label_id = client.get("/api/labels", headers=auth_headers).json()[0]["id"]
+    task_id = create_task(label_ids=[label_id])["id"]
+    
+    assert client.delete(f"/api/labels/{label_id}", headers=auth_headers).status_code == 204
+    
+    assert client.get(f"/api/tasks/{task_id}", headers=auth_headers).json()["label_ids"] == []
+    assert label_id not in client.get("/api/tasks/summary", headers=auth_headers).json()["by_label"]
+    assert client.delete(f"/api/labels/{label_id}", headers=auth_headers).status_code == 404
+
+
+def test_label_delete_reports_database_errors_as_500(client, auth_headers, monkeypatch):
+    from pymongo.errors import OperationFailure
+    from app.routers import labels as labels_router
+    
+    async def failing_cascade(*args, **kwargs):
+        raise OperationFailure("cascade failed")
+    monkeypatch.setattr(labels_router, "remove_label_from_tasks", failing_cascade)
+    label_id = client.get("/api/labels", headers=auth_headers).json()[0]["id"]
+    
+    response = client.delete(f"/api/labels/{label_id}", headers=auth_headers)
+    
+    assert response.status_code == 500 and "Database error" in response.json()["detail"]
+    # Without a transaction the label is gone; no reader may still see it
+    assert label_id not in [label["id"] for label in client.get("/api/labels", headers=auth_headers).json()]
+    assert client.delete("/api/labels/not-an-id", headers=auth_headers).status_code == 400
+
+
+def test_large_label_cascade_runs_in_background(client, auth_headers, monkeypatch, create_task):
+    from app.config import settings
+    
+    label_id = client.get("/api/labels", headers=auth_headers).json()[0]["id"]
+    for _ in range(3):
+        create_task(label_ids=[label_id])
+    assert client.get("/api/tasks/summary", headers=auth_headers).json()["by_label"][label_id] == 3
+    monkeypatch.setattr(settings, "LABEL_CASCADE_BACKGROUND_THRESHOLD", 2)
+    
+    assert client.delete(f"/api/labels/{label_id}", headers=auth_headers).status_code == 204
+    
+    assert all(label_id not in task["label_ids"] for task in client.get("/api/tasks", headers=auth_headers).json())
+    assert label_id not in client.get("/api/tasks/summary", headers=auth_headers).json()["by_label"]
@@ -0,0 +1,24 @@
+import pytest
+
+from app.config import settings
+
+
+@pytest.fixture
+def metrics_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "metrics-secret")
+    return "metrics-secret"
+
+
+def test_metrics_are_hidden_without_a_token(client):
+    assert client.get("/metrics").status_code == 404
+
+
+def test_metrics_require_the_configured_token(client, metrics_token, auth_headers):
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    # A user's access token is not a metrics token
+    assert client.get("/metrics", headers=auth_headers).status_code == 401
+    
+    response = client.get("/metrics", headers={"Authorization": f"Bearer {metrics_token}"})
+    assert response.status_code == 200
+    assert {"password_hash_pool", "label_cache", "events", "database"} <= set(response.json())
@@ -0,0 +1,78 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from app.models.task import TaskModel
+
+
+def _random_tasks(rng: random.Random, count: int) -> list[dict]:
+    """Tasks with deadlines spread around now, never within a minute of it."""
+    now = datetime.utcnow()
+    tasks = []
+    for index in range(count):
+        offset = timedelta(minutes=rng.randint(1, 60 * 24 * 30))
+        deadline = now + offset if rng.random() < 0.5 else now - offset
+        task = TaskModel.create_task(
+            title=f"Task {index}",
+            description=None,
+            priority=rng.choice(["High", "Medium", "Low"]),
+            deadline=deadline,
+            user_id="user-1"
+        )
+        task["completed"] = rng.random() < 0.3
+        tasks.append(task)
+    return tasks
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("overdue", [True, False])
+def test_overdue_filter_matches_python_check(client, seed, overdue):
+    """The MongoDB predicate selects exactly the tasks is_overdue flags."""
+    collection = AsyncMongoMockClient()["todo_test"][TaskModel.get_collection_name()]
+    tasks = _random_tasks(random.Random(seed), 200)
+    
+    async def matching_ids():
+        await collection.insert_many(tasks)
+        query = {"user_id": "user-1", **TaskModel.overdue_filter(overdue)}
+        return {task["_id"] async for task in collection.find(query, {"_id": 1})}
+    
+    matched = client.portal.call(matching_ids)
+    expected = {
+        task["_id"] for task in tasks
+        if TaskModel.is_overdue(task["deadline"], task["completed"]) == overdue
+    }
+    assert matched == expected
+
+
+def test_overdue_query_combines_with_pagination(client, auth_headers, create_task):
+    """Paging through overdue=true returns every overdue task exactly once."""
+    rng = random.Random(42)
+    expected = set()
+    for task in _random_tasks(rng, 30):
+        created = create_task(
+            title=task["title"],
+            priority=task["priority"],
+            deadline=task["deadline"].isoformat() + "Z"
+        )
+        if task["completed"]:
+            assert client.patch(f"/api/tasks/{created['id']}/complete", headers=auth_headers).status_code == 200
+        if TaskModel.is_overdue(task["deadline"], task["completed"]):
+            expected.add(created["title"])
+    
+    seen = []
+    cursor = None
+    while True:
+        params = {"overdue": "true", "limit": 7, "sort_by": "deadline", "order": "asc"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/tasks", headers=auth_headers, params=params)
+        assert response.status_code == 200, response.text
+        assert all(task["is_overdue"] for task in response.json())
+        seen.extend(task["title"] for task in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    
+    assert sorted(seen) == sorted(expected)
@@ -0,0 +1,164 @@
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.config import settings
+from app.models.token import TokenModel
+from app.models.token_family import TokenFamilyModel
+
+
+def _refresh(client, refresh_token: str) -> httpx.Response:
+    return client.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def _live_tokens(client, db) -> list[dict]:
+    async def find():
+        return await db[TokenModel.get_collection_name()].find({"revoked": False}).to_list(length=None)
+    return client.portal.call(find)
+
+
+def test_rotation_stores_only_a_digest(client, db, tokens):
+    response = _refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200, response.text
+    new_token = response.json()["refresh_token"]
+    
+    live = _live_tokens(client, db)
+    assert len(live) == 1
+    assert live[0]["token_hash"] == TokenModel.hash_token(new_token)
+    assert "token" not in live[0]
+
+
+def test_parallel_refreshes_rotate_exactly_once(client, db, tokens, parallel):
+    """Of concurrent refreshes with one token only one succeeds, and it stays valid."""
+    responses = parallel(8, "POST", "/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    
+    winners = [response for response in responses if response.status_code == 200]
+    assert len(winners) == 1
+    assert all(response.status_code == 401 for response in responses if response.status_code != 200)
+    assert len(_live_tokens(client, db)) == 1
+    
+    # Losers inside the grace window must not have revoked the winner's family
+    assert _refresh(client, winners[0].json()["refresh_token"]).status_code == 200
+
+
+def test_reuse_after_grace_revokes_the_family(client, db, tokens, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_TOKEN_REUSE_GRACE_SECONDS", 0)
+    new_token = _refresh(client, tokens["refresh_token"]).json()["refresh_token"]
+    
+    response = _refresh(client, tokens["refresh_token"])
+    
+    assert response.status_code == 401 and "reuse" in response.json()["detail"]
+    assert _refresh(client, new_token).status_code == 401
+    assert _live_tokens(client, db) == []
+
+
+def test_rotation_racing_a_revocation_is_withdrawn(client, db, tokens):
+    """A rotation that lands after its family was revoked does not survive."""
+    family_id = _live_tokens(client, db)[0]["family_id"]
+    
+    async def revoke_family():
+        await db[TokenFamilyModel.get_collection_name()].insert_one({
+            "_id": family_id,
+            **TokenFamilyModel.create_revocation(user_id="user", expires_at=datetime.utcnow() + timedelta(days=1))
+        })
+    client.portal.call(revoke_family)
+    
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    assert _live_tokens(client, db) == []
+
+
+def test_transactional_rotation_racing_a_revocation_is_withdrawn(client, db, tokens, monkeypatch):
+    """The marker check also runs after a committed rotation transaction."""
+    from app.database import db_manager
+    
+    family_id = _live_tokens(client, db)[0]["family_id"]
+    
+    class RacingSession:
+        """Commits the rotation after reuse detection's delete_many already ran.
+        
+        mongomock has no sessions, so the callback gets None and the revocation
+        that missed the uncommitted row is replayed right after it.
+        """
+        async def __aenter__(self):
+            return self
+        
+        async def __aexit__(self, *exc_info):
+            return False
+        
+        async def with_transaction(self, callback):
+            result = await callback(None)
+            await db[TokenFamilyModel.get_collection_name()].insert_one({
+                "_id": family_id,
+                **TokenFamilyModel.create_revocation(user_id="user", expires_at=datetime.utcnow() + timedelta(days=1))
+            })
+            return result
+    
+    async def start_session():
+        return RacingSession()
+    monkeypatch.setattr(db_manager, "supports_transactions", True)
+    monkeypatch.setattr(db.client, "start_session", start_session)
+    
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+    assert _live_tokens(client, db) == []
+
+
+def test_logout_deletes_the_token(client, db, tokens, auth_headers):
+    response = client.post("/api/auth/logout", headers=auth_headers, json={"refresh_token": tokens["refresh_token"]})
+    
+    assert response.status_code == 200
+    assert _live_tokens(client, db) == []
+    assert _refresh(client, tokens["refresh_token"]).status_code == 401
+
+
+def test_startup_removes_refresh_tokens_from_the_raw_token_schema(client, db):
+    """Rows without a token_hash would collide in the unique index and block startup."""
+    from app.database import db_manager
+    
+    async def seed_and_reindex():
+        collection = db[TokenModel.get_collection_name()]
+        await collection.drop()
+        await collection.insert_many([
+            {"user_id": "user", "token": f"legacy-{i}", "expires_at": datetime.utcnow() + timedelta(days=1), "revoked": False}
+            for i in range(2)
+        ])
+        await db_manager.ensure_indexes()
+        return await collection.count_documents({}), await collection.index_information()
+    count, indexes = client.portal.call(seed_and_reindex)
+    
+    assert count == 0
+    assert indexes["token_hash_1"]["unique"] is True
+
+
+def test_store_stays_bounded_under_a_month_of_refresh_churn(client, db, tokens, monkeypatch):
+    """Hourly rotation for 30 days plateaus at one expiry window of tombstones."""
+    import app.routers.auth as auth_router
+    
+    clock = [datetime.utcnow()]
+    
+    class FakeDatetime(datetime):
+        @classmethod
+        def utcnow(cls):
+            return clock[0]
+    monkeypatch.setattr(auth_router, "datetime", FakeDatetime)
+    
+    collection = db[TokenModel.get_collection_name()]
+    
+    async def expire_and_count():
+        # Stands in for MongoDB's TTL monitor, which mongomock does not run
+        await collection.delete_many({"expires_at": {"$lte": clock[0]}})
+        return await collection.count_documents({})
+    
+    refresh_token = tokens["refresh_token"]
+    window = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24
+    sizes = []
+    for _ in range(30 * 24):
+        clock[0] += timedelta(hours=1)
+        response = _refresh(client, refresh_token)
+        assert response.status_code == 200, response.text
+        refresh_token = response.json()["refresh_token"]
+        sizes.append(client.portal.call(expire_and_count))
+    
+    # One live token plus the tombstones still inside their expiry window
+    assert max(sizes) <= window + 1
+    assert sizes[-1] == sizes[-window // 2]
+    assert len(_live_tokens(client, db)) == 1
@@ -0,0 +1,57 @@
+import pytest
+from pydantic import ValidationError
+from mongomock_motor import AsyncMongoMockClient
+
+from app.config import Settings, settings
+from app.database import db_manager
+from app.models.user import UserModel
+
+
+def _register(client, email="new@example.com", username="newuser"):
+    return client.post("/api/auth/register", json={"email": email, "username": username, "password": "secret123"})
+
+
+def test_registration_seeds_default_labels(client, tokens, auth_headers):
+    labels = client.get("/api/labels", headers=auth_headers).json()
+    assert sorted(label["name"] for label in labels) == sorted(label["name"] for label in settings.default_labels)
+
+
+def test_duplicate_email_and_username_are_rejected(client, tokens):
+    response = _register(client, email="user@example.com")
+    assert response.status_code == 400 and response.json()["detail"] == "Email already registered"
+    
+    response = _register(client, username="testuser")
+    assert response.status_code == 400 and response.json()["detail"] == "Username already taken"
+
+
+def test_unique_index_failure_stops_startup(client):
+    """Existing duplicates must not leave signups running without the unique index."""
+    database = AsyncMongoMockClient()["todo_duplicates"]
+    users = [UserModel.create_user(email="dup@example.com", username=f"user{i}", hashed_password="x") for i in range(2)]
+    
+    async def ensure_indexes_with_duplicates():
+        await database[UserModel.get_collection_name()].insert_many(users)
+        previous_db, db_manager.db = db_manager.db, database
+        try:
+            await db_manager.ensure_indexes()
+        finally:
+            db_manager.db = previous_db
+    
+    with pytest.raises(RuntimeError, match="unique indexes for 'users'"):
+        client.portal.call(ensure_indexes_with_duplicates)
+
+
+@pytest.mark.parametrize("template", [
+    "Work",
+    "Work:blue",
+    ":#FFFFFF",
+    "Work:#FFFFFF,Work:#000000"
+])
+def test_invalid_default_label_templates_are_rejected(template):
+    with pytest.raises(ValidationError):
+        Settings(DEFAULT_LABELS=template)
+
+
+def test_default_label_template_is_parsed():
+    parsed = Settings(DEFAULT_LABELS="Work:#3b82f6, Home : #10B981,").default_labels
+    assert parsed == [{"name": "Work", "color": "#3B82F6"}, {"name": "Home", "color": "#10B981"}]
@@ -0,0 +1,89 @@
+from datetime import datetime, timezone
+from typing import List
+
+import pytest
+from bson import ObjectId
+from pydantic import TypeAdapter
+
+from app.config import settings
+from app.schemas.task import TaskResponse, partial_task_list_response
+from app.utils import serialization
+from app.utils.serialization import dump_tasks
+
+TASK_LIST = TypeAdapter(List[TaskResponse])
+
+
+def _task_dicts() -> list[dict]:
+    """Task dicts as list endpoints build them, including awkward values."""
+    return [
+        {
+            "id": str(ObjectId()),
+            "title": "Plain",
+            "description": None,
+            "priority": "High",
+            "deadline": datetime(2030, 5, 1, 12, 0),
+            "completed": False,
+            "user_id": "user-1",
+            "label_ids": [],
+            "created_at": datetime(2024, 1, 2, 3, 4, 5, 678901),
+            "updated_at": datetime(2024, 1, 2, 3, 4, 5, 678901),
+            "is_overdue": False
+        },
+        {
+            "id": str(ObjectId()),
+            "title": "Ünïcode \"quotes\" and \\ backslash",
+            "description": "Line one\nline two ☃",
+            "priority": "Low",
+            "deadline": datetime(2020, 1, 1, tzinfo=timezone.utc),
+            "completed": True,
+            "user_id": "user-1",
+            "label_ids": [str(ObjectId()), str(ObjectId())],
+            "created_at": datetime(2019, 12, 31, 23, 59, 59),
+            "updated_at": datetime(2020, 1, 1, 0, 0, 0, 1),
+            "is_overdue": False,
+            # Extra document fields are dropped by both paths
+            "score": 1.5
+        }
+    ]
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Run each golden test with and without orjson."""
+    if request.param == "orjson":
+        if serialization.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(serialization, "orjson", None)
+    return request.param
+
+
+def test_dump_tasks_matches_pydantic_output(encoder):
+    tasks = _task_dicts()
+    assert dump_tasks(tasks) == TASK_LIST.dump_json(TASK_LIST.validate_python(tasks))
+
+
+def test_dump_tasks_matches_sparse_fieldset_output(encoder):
+    tasks = _task_dicts()
+    field_names = ("id", "title", "deadline", "is_overdue")
+    adapter = partial_task_list_response(field_names)
+    assert dump_tasks(tasks, field_names) == adapter.dump_json(adapter.validate_python(tasks))
+
+
+def test_fast_json_list_endpoint_matches_default(client, auth_headers, monkeypatch, encoder, create_task):
+    """GET /api/tasks returns identical bytes with FAST_JSON_RESPONSES on and off."""
+    for index in range(3):
+        create_task(
+            title=f"Task {index} é",
+            description=None if index else "desc",
+            priority="Medium",
+            deadline=f"202{index * 4}-06-01T08:30:00.250000Z"
+        )
+    
+    for query in ("", "?fields=title,deadline,is_overdue"):
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", False)
+        default = client.get(f"/api/tasks{query}", headers=auth_headers)
+        monkeypatch.setattr(settings, "FAST_JSON_RESPONSES", True)
+        fast = client.get(f"/api/tasks{query}", headers=auth_headers)
+        assert fast.status_code == default.status_code == 200
+        assert fast.content == default.content
@@ -0,0 +1,54 @@
+from app.models.task_summary import TaskSummaryModel
+from app.utils.task_summary import reconcile_all_summaries
+
+
+def _stored_summaries(client, db) -> list[dict]:
+    async def find():
+        return await db[TaskSummaryModel.get_collection_name()].find({}).to_list(length=None)
+    return client.portal.call(find)
+
+
+def test_registration_creates_an_empty_summary(client, db, tokens):
+    summaries = _stored_summaries(client, db)
+    assert len(summaries) == 1
+    assert summaries[0]["total"] == 0 and summaries[0]["by_priority"] == {}
+
+
+def test_task_writes_increment_the_stored_summary(client, auth_headers, create_task):
+    create_task(title="Counted", priority="High")
+    create_task(title="Counted", priority="High")
+    
+    summary = client.get("/api/tasks/summary", headers=auth_headers).json()
+    assert summary["total"] == 2 and summary["by_priority"]["High"] == 2
+
+
+def test_summary_read_never_stores_a_rebuild(client, db, auth_headers, create_task):
+    """A user without a stored summary is answered from tasks until backfilled.
+    
+    Storing that rebuild from the read path could race with a task write's
+    $inc and count the task twice.
+    """
+    client.portal.call(db[TaskSummaryModel.get_collection_name()].delete_many, {})
+    create_task(title="Counted", priority="High")
+    
+    assert client.get("/api/tasks/summary", headers=auth_headers).json()["total"] == 1
+    assert _stored_summaries(client, db) == []
+    
+    drifted = client.portal.call(reconcile_all_summaries, db)
+    assert len(drifted) == 1 and drifted[0]["stored"] is None
+    
+    create_task(title="Counted", priority="High")
+    assert client.get("/api/tasks/summary", headers=auth_headers).json()["total"] == 2
+    assert client.portal.call(reconcile_all_summaries, db) == []
+
+
+def test_reconcile_repairs_drift(client, db, auth_headers, create_task):
+    create_task(title="Counted", priority="High")
+    client.portal.call(
+        db[TaskSummaryModel.get_collection_name()].update_many, {}, {"$inc": {"total": 5}}
+    )
+    
+    drifted = client.portal.call(reconcile_all_summaries, db)
+    
+    assert [(drift["stored"]["total"], drift["expected"]["total"]) for drift in drifted] == [(6, 1)]
+    assert client.get("/api/tasks/summary", headers=auth_headers).json()["total"] == 1
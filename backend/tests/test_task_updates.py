@@ -0,0 +1,34 @@
+def test_parallel_toggles_are_not_lost(client, auth_headers, create_task, parallel):
+    """Each concurrent toggle flips the state exactly once."""
+    task_id = create_task(title="Toggle me")["id"]
+    
+    responses = parallel(9, "PATCH", f"/api/tasks/{task_id}/complete", headers=auth_headers)
+    
+    assert all(response.status_code == 200 for response in responses)
+    states = [response.json()["completed"] for response in responses]
+    assert states.count(True) == 5 and states.count(False) == 4
+    assert client.get(f"/api/tasks/{task_id}", headers=auth_headers).json()["completed"] is True
+    
+    summary = client.get("/api/tasks/summary", headers=auth_headers).json()
+    assert summary["completed"] == 1 and summary["pending"] == 0
+
+
+def test_update_returns_new_state(client, auth_headers, create_task):
+    """update_task answers with the document as written."""
+    task_id = create_task()["id"]
+    
+    response = client.put(f"/api/tasks/{task_id}", headers=auth_headers, json={"title": "Renamed", "priority": "High"})
+    
+    assert response.status_code == 200, response.text
+    assert response.json()["title"] == "Renamed" and response.json()["priority"] == "High"
+    assert client.get(f"/api/tasks/{task_id}", headers=auth_headers).json()["title"] == "Renamed"
+
+
+def test_update_of_another_users_task_is_not_found(client, auth_headers, create_task):
+    task_id = create_task()["id"]
+    client.post("/api/auth/register", json={"email": "other@example.com", "username": "other", "password": "secret123"})
+    other = client.post("/api/auth/login", json={"email": "other@example.com", "password": "secret123"}).json()
+    other_headers = {"Authorization": f"Bearer {other['access_token']}"}
+    
+    assert client.put(f"/api/tasks/{task_id}", headers=other_headers, json={"title": "x"}).status_code == 404
+    assert client.patch(f"/api/tasks/{task_id}/complete", headers=other_headers).status_code == 404